@@ -5,7 +5,7 @@
 
 {
     "name": "Sale Automatic Workflow",
-    "version": "16.0.1.1.1",
+    "version": "16.0.1.2.0",
     "category": "Sales Management",
     "license": "AGPL-3",
     "author": "Akretion, "
@@ -18,6 +18,7 @@
         "security/ir.model.access.csv",
         "views/sale_view.xml",
         "views/sale_workflow_process_view.xml",
+        "views/automatic_workflow_run_log_view.xml",
         "data/automatic_workflow_data.xml",
     ],
     "installable": True,
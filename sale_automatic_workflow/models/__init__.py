@@ -1,5 +1,8 @@
 from . import account_move
 from . import automatic_workflow_job
+from . import automatic_workflow_run_log
+from . import automatic_workflow_shard
+from . import mail_mail
 from . import sale_order
 from . import sale_workflow_process
 from . import stock_move
@@ -4,9 +4,13 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
 import logging
+import threading
+import time
+from collections import Counter, defaultdict
 from contextlib import contextmanager
 
-from odoo import api, fields, models
+from odoo import api, fields, models, tools
+from odoo.tools import split_every
 from odoo.tools.safe_eval import safe_eval
 
 _logger = logging.getLogger(__name__)
@@ -35,6 +39,112 @@ class AutomaticWorkflowJob(models.Model):
         " invoices, pickings..."
     )
 
+    def _get_chunk_size(self):
+        """Size of the chunks processed at once, 0 to process the records
+        one by one"""
+        return self.env.context.get("auto_workflow_chunk_size") or 0
+
+    def _run_by_chunks(self, records, domain_filter, chunk_method, record_method):
+        """Process records by chunks instead of one by one.
+
+        ``chunk_method`` and ``record_method`` are the names of the methods
+        processing respectively a chunk of records and a single record.
+        The records are split by increasing ids so the chunks stay the same
+        from one run to another when new records are appended.
+
+        Return the statistics of the chunks.
+        """
+        stats = Counter()
+        ids = sorted(records.ids)
+        for chunk in split_every(self._get_chunk_size(), ids, records.browse):
+            stats += self._dispatch_chunk(
+                chunk, domain_filter, chunk_method, record_method
+            )
+        return stats
+
+    def _dispatch_chunk(self, records, domain_filter, chunk_method, record_method):
+        """Process a chunk of records right away, return its statistics"""
+        return self._process_chunk(
+            records, domain_filter, chunk_method, record_method
+        )[1]
+
+    def _run_chunk(self, records, domain_filter, chunk_method, record_method):
+        """Process a chunk of records, return a summary of the outcome"""
+        return self._process_chunk(
+            records, domain_filter, chunk_method, record_method
+        )[0]
+
+    def _process_chunk(self, records, domain_filter, chunk_method, record_method):
+        """Process a chunk of records.
+
+        The domain is checked again for all the records in a single query,
+        then ``chunk_method`` is called once per company with the records
+        still matching it. If it fails, the chunk is rolled back and processed
+        again record by record.
+
+        Return a summary of the outcome and the statistics of the chunk.
+        """
+        model = self.env[records._name]
+        chunk = model.search([("id", "in", records.ids)] + domain_filter)
+        stats = Counter(bypassed=len(records) - len(chunk))
+        chunks_by_company = defaultdict(lambda: model.browse())
+        for record in chunk:
+            chunks_by_company[record.company_id] |= record
+        results = []
+        for company, company_chunk in chunks_by_company.items():
+            company_chunk = company_chunk.with_company(company)
+            try:
+                with self.env.cr.savepoint():
+                    results.append(getattr(self, chunk_method)(company_chunk))
+                stats["processed"] += len(company_chunk)
+            except Exception:
+                _logger.warning(
+                    "Error during an automatic workflow action on %s, "
+                    "processing its records one by one.",
+                    company_chunk,
+                    exc_info=True,
+                )
+                stats += self._run_chunk_fallback(
+                    company_chunk, domain_filter, record_method
+                )
+                results.append(
+                    "{} {} processed one by one".format(
+                        len(company_chunk), company_chunk._description
+                    )
+                )
+        return "\n".join(results), stats
+
+    def _run_chunk_fallback(self, records, domain_filter, record_method):
+        """Process the records of a failed chunk one by one, each one in its
+        own savepoint, as it is done without chunks. Return their statistics.
+        """
+        stats = Counter()
+        for record in records:
+            outcome = self._run_record(record_method, record, domain_filter)
+            stats[outcome] += 1
+        return stats
+
+    def _run_record(self, method_name, record, *args):
+        """Run ``method_name`` on a record in its own savepoint.
+
+        The exceptions are logged then discarded. Return the outcome to count
+        in the statistics of the step.
+        """
+        failed = True
+        with savepoint(self.env.cr):
+            res = getattr(self, method_name)(record, *args)
+            failed = False
+        if failed:
+            return "failed"
+        return self._get_record_outcome(res)
+
+    def _get_record_outcome(self, res):
+        """Outcome of a record from the result ``res`` of its method:
+        bypassed or processed"""
+        if isinstance(res, str) and "job bypassed" in res:
+            return "bypassed"
+        return "processed"
+
     def _do_validate_sale_order(self, sale, domain_filter):
         """Validate a sales order, filter ensure no duplication"""
         if not self.env["sale.order"].search_count(
@@ -58,18 +168,56 @@ class AutomaticWorkflowJob(models.Model):
             sale.display_name, sale
         )
 
+    def _do_validate_sale_order_chunk(self, sales):
+        """Validate sales orders already filtered by the workflow domain"""
+        sales.action_confirm()
+        if self.env.context.get("send_order_confirmation_mail"):
+            self._do_send_order_confirmation_mail_chunk(sales)
+        return "{} sales orders confirmed successfully".format(len(sales))
+
+    def _do_send_order_confirmation_mail_chunk(self, sales):
+        """Send order confirmation mails of the confirmed orders of a chunk,
+        as their salesperson when they have one"""
+        sales_by_user = defaultdict(lambda: self.env["sale.order"])
+        for sale in sales.filtered(lambda s: s.state == "sale"):
+            sales_by_user[sale.user_id] |= sale
+        for user, user_sales in sales_by_user.items():
+            if user:
+                user_sales = user_sales.with_user(user)
+            user_sales._send_order_confirmation_mail()
+
+    def _do_validate_sale_order_and_mail(self, sale, domain_filter, send_mail=None):
+        """Validate a sales order then send its confirmation mail when
+        ``send_mail`` is set, or by default when the context asks for it"""
+        res = self._do_validate_sale_order(sale, domain_filter)
+        if send_mail is None:
+            send_mail = self.env.context.get("send_order_confirmation_mail")
+        if send_mail:
+            self._do_send_order_confirmation_mail(sale)
+        return res
+
     @api.model
     def _validate_sale_orders(self, order_filter):
         sale_obj = self.env["sale.order"]
         sales = sale_obj.search(order_filter)
+        stats = Counter(scanned=len(sales))
         _logger.debug("Sale Orders to validate: %s", sales.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                sales,
+                order_filter,
+                "_do_validate_sale_order_chunk",
+                "_do_validate_sale_order_and_mail",
+            )
+            return stats
         for sale in sales:
-            with savepoint(self.env.cr):
-                self._do_validate_sale_order(
-                    sale.with_company(sale.company_id), order_filter
-                )
-                if self.env.context.get("send_order_confirmation_mail"):
-                    self._do_send_order_confirmation_mail(sale)
+            outcome = self._run_record(
+                "_do_validate_sale_order_and_mail",
+                sale.with_company(sale.company_id),
+                order_filter,
+            )
+            stats[outcome] += 1
+        return stats
 
     def _do_create_invoice(self, sale, domain_filter):
         """Create an invoice for a sales order, filter ensure no duplication"""
@@ -83,16 +231,54 @@ class AutomaticWorkflowJob(models.Model):
         payment.with_context(active_model="sale.order").create_invoices()
         return "{} {} create invoice successfully".format(sale.display_name, sale)
 
+    def _do_create_invoice_chunk(self, sales):
+        """Create the invoices of sales orders already filtered by the
+        workflow domain.
+
+        The invoices are created at once without going through the advance
+        payment wizard, one invoice per order as the wizard does. The
+        workflow options are applied by ``sale.order``, the service lines are
+        delivered before looking for the lines to invoice.
+        """
+        results = []
+        sales._deliver_service_lines()
+        to_invoice = self.env["sale.order"]
+        for sale in sales:
+            if sale._get_invoiceable_lines(final=True):
+                to_invoice |= sale
+            else:
+                result = "{} {} job bypassed: nothing to invoice".format(
+                    sale.display_name, sale
+                )
+                _logger.info(result)
+                results.append(result)
+        if to_invoice:
+            to_invoice._create_invoices(grouped=True, final=True)
+            results.append(
+                "{} sales orders invoiced successfully".format(len(to_invoice))
+            )
+        return "\n".join(results)
+
     @api.model
     def _create_invoices(self, create_filter):
         sale_obj = self.env["sale.order"]
         sales = sale_obj.search(create_filter)
+        stats = Counter(scanned=len(sales))
         _logger.debug("Sale Orders to create Invoice: %s", sales.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                sales,
+                create_filter,
+                "_do_create_invoice_chunk",
+                "_do_create_invoice",
+            )
+            return stats
         for sale in sales:
-            with savepoint(self.env.cr):
-                self._do_create_invoice(
-                    sale.with_company(sale.company_id), create_filter
-                )
+            outcome = self._run_record(
+                "_do_create_invoice", sale.with_company(sale.company_id), create_filter
+            )
+            stats[outcome] += 1
+        return stats
 
     def _do_validate_invoice(self, invoice, domain_filter):
         """Validate an invoice, filter ensure no duplication"""
@@ -105,16 +291,33 @@ class AutomaticWorkflowJob(models.Model):
             invoice.display_name, invoice
         )
 
+    def _do_validate_invoice_chunk(self, invoices):
+        """Validate invoices already filtered by the workflow domain"""
+        invoices.action_post()
+        return "{} invoices validated successfully".format(len(invoices))
+
     @api.model
     def _validate_invoices(self, validate_invoice_filter):
         move_obj = self.env["account.move"]
         invoices = move_obj.search(validate_invoice_filter)
+        stats = Counter(scanned=len(invoices))
         _logger.debug("Invoices to validate: %s", invoices.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                invoices,
+                validate_invoice_filter,
+                "_do_validate_invoice_chunk",
+                "_do_validate_invoice",
+            )
+            return stats
         for invoice in invoices:
-            with savepoint(self.env.cr):
-                self._do_validate_invoice(
-                    invoice.with_company(invoice.company_id), validate_invoice_filter
-                )
+            outcome = self._run_record(
+                "_do_validate_invoice",
+                invoice.with_company(invoice.company_id),
+                validate_invoice_filter,
+            )
+            stats[outcome] += 1
+        return stats
 
     def _do_send_invoice(self, invoice, domain_filter):
         """Validate an invoice, filter ensure no duplication"""
@@ -151,16 +354,106 @@ class AutomaticWorkflowJob(models.Model):
 
         return "{} {} sent invoice successfully".format(invoice.display_name, invoice)
 
+    def _do_send_invoice_chunk(self, invoices):
+        """Send invoices already filtered by the workflow domain.
+
+        The mails of all the invoices using the same template are rendered at
+        once and created in the mail queue, they are not sent right away. The
+        reports are rendered and attached by the mail queue.
+        """
+        invoices_by_template = defaultdict(lambda: self.env["account.move"])
+        for invoice in invoices:
+            template = self.env.ref(
+                invoice._get_mail_template(), raise_if_not_found=False
+            )
+            invoices_by_template[template] |= invoice
+        mails = self.env["mail.mail"]
+        for template, template_invoices in invoices_by_template.items():
+            if template:
+                mails |= self._queue_invoice_mails(template, template_invoices)
+        invoices.browse(mails.mapped("res_id")).sudo().write({"is_move_sent": True})
+        return "{} invoice mails queued successfully".format(len(mails))
+
+    def _render_invoice_mails(self, template, invoices):
+        """Render the fields of the mails of ``template`` for all the
+        invoices, in the language of each one, without their report"""
+        fields = [
+            "subject",
+            "body_html",
+            "email_from",
+            "email_cc",
+            "email_to",
+            "partner_to",
+            "reply_to",
+            "scheduled_date",
+        ]
+        all_values = {}
+        lang_templates = template._classify_per_lang(invoices.ids)
+        for lang_template, res_ids in lang_templates.values():
+            for field in fields:
+                rendered = lang_template._render_field(
+                    field, res_ids, post_process=(field == "body_html")
+                )
+                for res_id, value in rendered.items():
+                    all_values.setdefault(res_id, {})[field] = value
+            all_values = lang_template.generate_recipients(all_values, res_ids)
+        return all_values
+
+    def _queue_invoice_mails(self, template, invoices):
+        """Render ``template`` for all the invoices at once and create their
+        mails, without sending them nor rendering their reports"""
+        all_values = self._render_invoice_mails(template, invoices)
+        subtype = self.env.ref("mail.mt_comment")
+        mail_vals_list = []
+        for invoice in invoices:
+            values = all_values[invoice.id]
+            values.pop("partner_to", None)
+            if not values.get("email_from"):
+                values.pop("email_from", None)
+            if values.get("body_html"):
+                values["body"] = tools.html_sanitize(values["body_html"])
+            values.update(
+                {
+                    "model": invoice._name,
+                    "res_id": invoice.id,
+                    "message_type": "comment",
+                    "subtype_id": subtype.id,
+                    "mail_server_id": template.mail_server_id.id,
+                    "auto_delete": template.auto_delete,
+                    "recipient_ids": [
+                        (4, partner_id) for partner_id in values.pop("partner_ids", [])
+                    ],
+                    "attachment_ids": [(4, aid) for aid in template.attachment_ids.ids],
+                    "workflow_report_template_id": (
+                        template.id if template.report_template else False
+                    ),
+                }
+            )
+            mail_vals_list.append(values)
+        return self.env["mail.mail"].sudo().create(mail_vals_list)
+
     @api.model
     def _send_invoices(self, send_invoice_filter):
         move_obj = self.env["account.move"]
         invoices = move_obj.search(send_invoice_filter)
+        stats = Counter(scanned=len(invoices))
         _logger.debug("Invoices to send: %s", invoices.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                invoices,
+                send_invoice_filter,
+                "_do_send_invoice_chunk",
+                "_do_send_invoice",
+            )
+            return stats
         for invoice in invoices:
-            with savepoint(self.env.cr):
-                self._do_send_invoice(
-                    invoice.with_company(invoice.company_id), send_invoice_filter
-                )
+            outcome = self._run_record(
+                "_do_send_invoice",
+                invoice.with_company(invoice.company_id),
+                send_invoice_filter,
+            )
+            stats[outcome] += 1
+        return stats
 
     def _do_validate_picking(self, picking, domain_filter):
         """Validate a stock.picking, filter ensure no duplication"""
@@ -173,14 +466,29 @@ class AutomaticWorkflowJob(models.Model):
             picking.display_name, picking
         )
 
+    def _do_validate_picking_chunk(self, pickings):
+        """Validate pickings already filtered by the workflow domain"""
+        pickings.validate_picking()
+        return "{} pickings validated successfully".format(len(pickings))
+
     @api.model
     def _validate_pickings(self, picking_filter):
         picking_obj = self.env["stock.picking"]
         pickings = picking_obj.search(picking_filter)
+        stats = Counter(scanned=len(pickings))
         _logger.debug("Pickings to validate: %s", pickings.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                pickings,
+                picking_filter,
+                "_do_validate_picking_chunk",
+                "_do_validate_picking",
+            )
+            return stats
         for picking in pickings:
-            with savepoint(self.env.cr):
-                self._do_validate_picking(picking, picking_filter)
+            outcome = self._run_record("_do_validate_picking", picking, picking_filter)
+            stats[outcome] += 1
+        return stats
 
     def _do_sale_done(self, sale, domain_filter):
         """Set a sales order to done, filter ensure no duplication"""
@@ -191,14 +499,31 @@ class AutomaticWorkflowJob(models.Model):
         sale.action_done()
         return "{} {} set done successfully".format(sale.display_name, sale)
 
+    def _do_sale_done_chunk(self, sales):
+        """Set sales orders already filtered by the workflow domain to done"""
+        sales.action_done()
+        return "{} sales orders set done successfully".format(len(sales))
+
     @api.model
     def _sale_done(self, sale_done_filter):
         sale_obj = self.env["sale.order"]
         sales = sale_obj.search(sale_done_filter)
+        stats = Counter(scanned=len(sales))
         _logger.debug("Sale Orders to done: %s", sales.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                sales,
+                sale_done_filter,
+                "_do_sale_done_chunk",
+                "_do_sale_done",
+            )
+            return stats
         for sale in sales:
-            with savepoint(self.env.cr):
-                self._do_sale_done(sale.with_company(sale.company_id), sale_done_filter)
+            outcome = self._run_record(
+                "_do_sale_done", sale.with_company(sale.company_id), sale_done_filter
+            )
+            stats[outcome] += 1
+        return stats
 
     def _prepare_dict_account_payment(self, invoice):
         partner_type = (
@@ -206,11 +531,17 @@ class AutomaticWorkflowJob(models.Model):
             and "customer"
             or "supplier"
         )
+        payment_type = (
+            invoice.move_type in ("out_invoice", "in_refund")
+            and "inbound"
+            or "outbound"
+        )
         return {
             "reconciled_invoice_ids": [(6, 0, invoice.ids)],
             "amount": invoice.amount_residual,
             "partner_id": invoice.partner_id.id,
             "partner_type": partner_type,
+            "payment_type": payment_type,
             "date": fields.Date.context_today(self),
         }
 
@@ -218,70 +549,241 @@ class AutomaticWorkflowJob(models.Model):
     def _register_payments(self, payment_filter):
         invoice_obj = self.env["account.move"]
         invoices = invoice_obj.search(payment_filter)
+        stats = Counter(scanned=len(invoices))
         _logger.debug("Invoices to Register Payment: %s", invoices.ids)
+        if self._get_chunk_size():
+            stats += self._run_by_chunks(
+                invoices,
+                payment_filter,
+                "_register_payment_invoice_chunk",
+                "_do_register_payment",
+            )
+            return stats
         for invoice in invoices:
-            with savepoint(self.env.cr):
-                self._register_payment_invoice(invoice)
-        return
+            outcome = self._run_record("_register_payment_invoice", invoice)
+            stats[outcome] += 1
+        return stats
+
+    def _do_register_payment(self, invoice, domain_filter):
+        """Register the payment of an invoice, filter ensure no duplication"""
+        if not self.env["account.move"].search_count(
+            [("id", "=", invoice.id)] + domain_filter
+        ):
+            return "{} {} job bypassed".format(invoice.display_name, invoice)
+        self._register_payment_invoice(invoice)
+        return "{} {} register payment successfully".format(
+            invoice.display_name, invoice
+        )
 
     def _register_payment_invoice(self, invoice):
         payment = self.env["account.payment"].create(
             self._prepare_dict_account_payment(invoice)
         )
         payment.action_post()
+        self._reconcile_payment_invoices(payment, invoice)
 
+    def _reconcile_payment_invoices(self, payment, invoices):
         domain = [
             ("account_type", "in", ("asset_receivable", "liability_payable")),
             ("reconciled", "=", False),
         ]
         payment_lines = payment.line_ids.filtered_domain(domain)
-        lines = invoice.line_ids
+        lines = invoices.line_ids
         for account in payment_lines.account_id:
             (payment_lines + lines).filtered_domain(
                 [("account_id", "=", account.id), ("reconciled", "=", False)]
             ).reconcile()
 
-    @api.model
-    def run_with_workflow(self, sale_workflow):
-        workflow_domain = [("workflow_process_id", "=", sale_workflow.id)]
-        if sale_workflow.validate_order:
-            self.with_context(
-                send_order_confirmation_mail=sale_workflow.send_order_confirmation_mail
-            )._validate_sale_orders(
-                safe_eval(sale_workflow.order_filter_id.domain) + workflow_domain
-            )
-        if sale_workflow.validate_picking:
-            self._validate_pickings(
-                safe_eval(sale_workflow.picking_filter_id.domain) + workflow_domain
-            )
-        if sale_workflow.create_invoice:
-            self._create_invoices(
-                safe_eval(sale_workflow.create_invoice_filter_id.domain)
-                + workflow_domain
-            )
-        if sale_workflow.validate_invoice:
-            self._validate_invoices(
-                safe_eval(sale_workflow.validate_invoice_filter_id.domain)
-                + workflow_domain
-            )
-        if sale_workflow.send_invoice:
-            self._send_invoices(
-                safe_eval(sale_workflow.send_invoice_filter_id.domain) + workflow_domain
-            )
-        if sale_workflow.sale_done:
-            self._sale_done(
-                safe_eval(sale_workflow.sale_done_filter_id.domain) + workflow_domain
+    def _reconcile_payments_invoices(self, payments, invoices):
+        """Reconcile payments with invoices in a single pass: the open
+        receivable and payable lines are grouped by account and partner, then
+        each group holding payment lines is reconciled at once"""
+        domain = [
+            ("account_type", "in", ("asset_receivable", "liability_payable")),
+            ("reconciled", "=", False),
+        ]
+        lines = (payments.line_ids | invoices.line_ids).filtered_domain(domain)
+        lines_by_key = defaultdict(lambda: self.env["account.move.line"])
+        for line in lines:
+            key = (line.account_id, line.partner_id.commercial_partner_id)
+            lines_by_key[key] |= line
+        for key_lines in lines_by_key.values():
+            if key_lines.payment_id:
+                key_lines.reconcile()
+
+    def _register_payment_invoice_chunk(self, invoices):
+        """Register the payments of invoices already filtered by the workflow
+        domain.
+
+        Invoices sharing the same payment values (partner, journal, ...),
+        currency and type are paid by a single payment, so refunds are never
+        netted with invoices. All the payments are created and posted at once,
+        then reconciled with their invoices in a single pass.
+        """
+        start = time.perf_counter()
+        invoices_by_key = defaultdict(lambda: self.env["account.move"])
+        vals_by_key = {}
+        for invoice in invoices:
+            vals = self._prepare_dict_account_payment(invoice)
+            key = tuple(
+                sorted(
+                    (name, value)
+                    for name, value in vals.items()
+                    if name not in ("amount", "reconciled_invoice_ids")
+                )
+            ) + (invoice.currency_id.id, invoice.move_type)
+            invoices_by_key[key] |= invoice
+            vals_by_key.setdefault(key, vals)
+        vals_list = []
+        for key, key_invoices in invoices_by_key.items():
+            vals = dict(
+                vals_by_key[key],
+                reconciled_invoice_ids=[(6, 0, key_invoices.ids)],
+                amount=sum(key_invoices.mapped("amount_residual")),
+                currency_id=key_invoices.currency_id.id,
             )
+            vals_list.append(vals)
+        payments = self.env["account.payment"].create(vals_list)
+        payments.action_post()
+        self._reconcile_payments_invoices(payments, invoices)
+        _logger.info(
+            "%s payments registered for %s invoices in %.2fs",
+            len(payments),
+            len(invoices),
+            time.perf_counter() - start,
+        )
+        return "{} payments registered for {} invoices successfully".format(
+            len(payments), len(invoices)
+        )
+
+    @api.model
+    def _get_workflow_steps(self):
+        """Steps of a workflow, in the order they are run.
+
+        Each step is a tuple (step, activation field, filter field, method)
+        where the fields are the ones of ``sale.workflow.process`` and the
+        method is the one of this model called with the filter domain.
+        """
+        return [
+            (
+                "validate_order",
+                "validate_order",
+                "order_filter_id",
+                "_validate_sale_orders",
+            ),
+            (
+                "validate_picking",
+                "validate_picking",
+                "picking_filter_id",
+                "_validate_pickings",
+            ),
+            (
+                "create_invoice",
+                "create_invoice",
+                "create_invoice_filter_id",
+                "_create_invoices",
+            ),
+            (
+                "validate_invoice",
+                "validate_invoice",
+                "validate_invoice_filter_id",
+                "_validate_invoices",
+            ),
+            (
+                "send_invoice",
+                "send_invoice",
+                "send_invoice_filter_id",
+                "_send_invoices",
+            ),
+            ("sale_done", "sale_done", "sale_done_filter_id", "_sale_done"),
+            (
+                "register_payment",
+                "register_payment",
+                "payment_filter_id",
+                "_register_payments",
+            ),
+        ]
 
-        if sale_workflow.register_payment:
-            self._register_payments(
-                safe_eval(sale_workflow.payment_filter_id.domain) + workflow_domain
+    @api.model
+    def _run_workflow_step(self, sale_workflow, step, company=None):
+        """Run one step of a workflow, if it is activated on it, optionally
+        only for the records of a company"""
+        for name, active_field, filter_field, method_name in self._get_workflow_steps():
+            if name != step:
+                continue
+            if not sale_workflow[active_field]:
+                return
+            domain = safe_eval(sale_workflow[filter_field].domain) + [
+                ("workflow_process_id", "=", sale_workflow.id)
+            ]
+            job = self
+            if company:
+                domain += [("company_id", "=", company.id)]
+                job = job.with_company(company)
+            job = job.with_context(
+                auto_workflow_chunk_size=sale_workflow.chunk_size,
+                send_order_confirmation_mail=(
+                    sale_workflow.send_order_confirmation_mail
+                ),
             )
+            start = time.perf_counter()
+            query_count = self.env.cr.sql_log_count
+            stats = getattr(job, method_name)(domain) or Counter()
+            if stats["scanned"]:
+                self.env["automatic.workflow.run.log"].sudo().create(
+                    {
+                        "run_date": self.env.context.get("auto_workflow_run_date")
+                        or fields.Datetime.now(),
+                        "workflow_process_id": sale_workflow.id,
+                        "company_id": company.id if company else False,
+                        "step": step,
+                        "scanned_count": stats["scanned"],
+                        "processed_count": stats["processed"],
+                        "bypassed_count": stats["bypassed"],
+                        "failed_count": stats["failed"],
+                        "delayed_count": stats["delayed"],
+                        "duration": time.perf_counter() - start,
+                        "query_count": self.env.cr.sql_log_count - query_count,
+                    }
+                )
+            return
+
+    @api.model
+    def run_with_workflow(self, sale_workflow):
+        for step, *__ in self._get_workflow_steps():
+            self._run_workflow_step(sale_workflow, step)
 
     @api.model
     def run(self):
         """Must be called from ir.cron"""
         sale_workflow_process = self.env["sale.workflow.process"]
+        job = self.with_context(auto_workflow_run_date=fields.Datetime.now())
         for sale_workflow in sale_workflow_process.search([]):
-            self.run_with_workflow(sale_workflow)
+            job.run_with_workflow(sale_workflow)
+        return True
+
+    @api.model
+    def run_sharded(self):
+        """Must be called from ir.cron
+
+        Split the work by workflow, company and step into shards which are
+        committed one by one. Shards are claimed with ``SKIP LOCKED`` so
+        several crons calling this method drain the queue together without
+        processing the same shard twice, while the steps of a workflow are
+        still run in order for a company.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        shard_obj = self.env["automatic.workflow.shard"].with_context(
+            auto_workflow_run_date=fields.Datetime.now()
+        )
+        shard_obj._enqueue_shards()
+        if auto_commit:
+            self.env.cr.commit()  # pylint: disable=invalid-commit
+        while True:
+            shard = shard_obj._claim_shard()
+            if not shard:
+                break
+            shard._run_shard()
+            if auto_commit:
+                self.env.cr.commit()  # pylint: disable=invalid-commit
         return True
@@ -0,0 +1,61 @@
+# Copyright 2026 Dixmit
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+
+class AutomaticWorkflowRunLog(models.Model):
+    """Statistics of a step of a workflow played by the automatic workflow
+    scheduler"""
+
+    _name = "automatic.workflow.run.log"
+    _description = "Automatic Workflow Run Log"
+    _order = "run_date desc, id desc"
+
+    run_date = fields.Datetime(
+        required=True, index=True, help="Start date of the scheduler run."
+    )
+    workflow_process_id = fields.Many2one(
+        comodel_name="sale.workflow.process",
+        required=True,
+        ondelete="cascade",
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        ondelete="cascade",
+        help="Set when the step has been run for the records of a single "
+        "company by the sharded scheduler.",
+    )
+    step = fields.Selection(selection="_selection_step", required=True)
+    scanned_count = fields.Integer(
+        string="Scanned", help="Records matching the filter of the step."
+    )
+    processed_count = fields.Integer(string="Processed")
+    bypassed_count = fields.Integer(
+        string="Bypassed",
+        help="Records not matching the filter anymore when processed.",
+    )
+    failed_count = fields.Integer(string="Failed")
+    delayed_count = fields.Integer(
+        string="Delayed",
+        help="Records handed over to queue jobs, processed afterwards.",
+    )
+    duration = fields.Float(string="Duration (s)", help="Wall time in seconds.")
+    query_count = fields.Integer(string="Queries")
+
+    @api.model
+    def _selection_step(self):
+        workflow_fields = self.env["sale.workflow.process"]._fields
+        return [
+            (step, workflow_fields[active_field].string)
+            for step, active_field, *__ in self.env[
+                "automatic.workflow.job"
+            ]._get_workflow_steps()
+        ]
+
+    @api.autovacuum
+    def _gc_run_logs(self):
+        limit_date = fields.Datetime.now() - timedelta(days=30)
+        self.search([("run_date", "<", limit_date)]).unlink()
@@ -0,0 +1,159 @@
+# Copyright 2026 Dixmit
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+import traceback
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class AutomaticWorkflowShard(models.Model):
+    """Unit of work of the sharded automatic workflow scheduler: one step of
+    a workflow for the records of one company"""
+
+    _name = "automatic.workflow.shard"
+    _description = "Automatic Workflow Shard"
+    _order = "id"
+
+    workflow_process_id = fields.Many2one(
+        comodel_name="sale.workflow.process",
+        required=True,
+        ondelete="cascade",
+    )
+    company_id = fields.Many2one(
+        comodel_name="res.company",
+        required=True,
+        ondelete="cascade",
+    )
+    step = fields.Char(required=True)
+    sequence = fields.Integer(
+        required=True,
+        help="Position of the step in the workflow, the shards of a workflow "
+        "and company are run in this order.",
+    )
+    state = fields.Selection(
+        selection=[
+            ("pending", "Pending"),
+            ("done", "Done"),
+            ("failed", "Failed"),
+        ],
+        default="pending",
+        required=True,
+    )
+    date_done = fields.Datetime()
+    error = fields.Text()
+
+    def init(self):
+        # A single pending shard per workflow, company and step, so that
+        # concurrent crons do not enqueue the same work twice.
+        self.env.cr.execute(
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS automatic_workflow_shard_pending_uniq
+            ON automatic_workflow_shard (workflow_process_id, company_id, step)
+            WHERE state = 'pending'
+            """
+        )
+
+    @api.model
+    def _enqueue_shards(self):
+        """Create the pending shards of every workflow and company"""
+        job_obj = self.env["automatic.workflow.job"]
+        steps = job_obj._get_workflow_steps()
+        companies = self.env["res.company"].search([])
+        values = []
+        for workflow in self.env["sale.workflow.process"].search([]):
+            for sequence, (step, active_field, *__) in enumerate(steps):
+                if not workflow[active_field]:
+                    continue
+                for company in companies:
+                    values.append((workflow.id, company.id, step, sequence))
+        if not values:
+            return
+        workflow_ids, company_ids, step_names, sequences = zip(*values)
+        self.flush_model()
+        # Plain SQL to skip the shards already pending, possibly enqueued
+        # by another cron in the meantime.
+        self.env.cr.execute(
+            """
+            INSERT INTO automatic_workflow_shard (
+                workflow_process_id, company_id, step, sequence, state,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT shard.workflow_process_id, shard.company_id, shard.step,
+                shard.sequence, 'pending',
+                %(uid)s, now() at time zone 'UTC',
+                %(uid)s, now() at time zone 'UTC'
+            FROM unnest(
+                %(workflow_ids)s, %(company_ids)s, %(steps)s, %(sequences)s
+            ) AS shard(workflow_process_id, company_id, step, sequence)
+            ON CONFLICT DO NOTHING
+            """,
+            {
+                "uid": self.env.uid,
+                "workflow_ids": list(workflow_ids),
+                "company_ids": list(company_ids),
+                "steps": list(step_names),
+                "sequences": list(sequences),
+            },
+        )
+
+    @api.model
+    def _claim_shard(self):
+        """Lock and return the next shard to run, skipping the shards locked
+        by other crons and the ones waiting for a previous step"""
+        self.flush_model()
+        self.env.cr.execute(
+            """
+            SELECT shard.id
+            FROM automatic_workflow_shard shard
+            WHERE shard.state = 'pending'
+            AND NOT EXISTS (
+                SELECT 1
+                FROM automatic_workflow_shard previous
+                WHERE previous.state = 'pending'
+                AND previous.workflow_process_id = shard.workflow_process_id
+                AND previous.company_id = shard.company_id
+                AND previous.sequence < shard.sequence
+            )
+            ORDER BY shard.id
+            LIMIT 1
+            FOR UPDATE OF shard SKIP LOCKED
+            """
+        )
+        row = self.env.cr.fetchone()
+        return self.browse(row and row[0])
+
+    def _run_shard(self):
+        self.ensure_one()
+        _logger.debug(
+            "Run step %s of workflow %s for company %s",
+            self.step,
+            self.workflow_process_id.name,
+            self.company_id.name,
+        )
+        try:
+            with self.env.cr.savepoint():
+                self.env["automatic.workflow.job"]._run_workflow_step(
+                    self.workflow_process_id, self.step, company=self.company_id
+                )
+        except Exception:
+            _logger.exception("Error during an automatic workflow shard.")
+            self.write(
+                {
+                    "state": "failed",
+                    "date_done": fields.Datetime.now(),
+                    "error": traceback.format_exc(),
+                }
+            )
+            return
+        self.write({"state": "done", "date_done": fields.Datetime.now()})
+
+    @api.autovacuum
+    def _gc_shards(self):
+        limit_date = fields.Datetime.now() - timedelta(days=1)
+        self.search(
+            [("state", "!=", "pending"), ("date_done", "<", limit_date)]
+        ).unlink()
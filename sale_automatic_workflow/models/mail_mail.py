@@ -0,0 +1,66 @@
+# Copyright 2026 Dixmit
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+import logging
+from collections import defaultdict
+
+from odoo import fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class MailMail(models.Model):
+    _inherit = "mail.mail"
+
+    workflow_report_template_id = fields.Many2one(
+        comodel_name="mail.template",
+        string="Report to Attach",
+        help="Template whose report is rendered and attached to the mail by "
+        "the mail queue, right before sending it.",
+    )
+
+    def _send(self, auto_commit=False, raise_exception=False, smtp_session=None):
+        self.filtered("workflow_report_template_id")._attach_workflow_reports()
+        return super()._send(
+            auto_commit=auto_commit,
+            raise_exception=raise_exception,
+            smtp_session=smtp_session,
+        )
+
+    def _attach_workflow_reports(self):
+        """Render the reports of the mails queued by the automatic workflow
+        and attach them, a template at a time"""
+        mails_by_template = defaultdict(lambda: self.browse())
+        for mail in self:
+            mails_by_template[mail.workflow_report_template_id] |= mail
+        for template, mails in mails_by_template.items():
+            try:
+                with self.env.cr.savepoint():
+                    all_values = template.generate_email(
+                        mails.mapped("res_id"), ["report_name"]
+                    )
+            except Exception as e:
+                _logger.exception("Unable to render the report of %s", mails)
+                mails.write({"state": "exception", "failure_reason": str(e)})
+                continue
+            for mail in mails:
+                attachments = all_values[mail.res_id].get("attachments", [])
+                mail.write(
+                    {
+                        "attachment_ids": [
+                            (
+                                0,
+                                0,
+                                {
+                                    "name": name,
+                                    "datas": datas,
+                                    "type": "binary",
+                                    "res_model": mail.model,
+                                    "res_id": mail.res_id,
+                                },
+                            )
+                            for name, datas in attachments
+                        ],
+                        "workflow_report_template_id": False,
+                    }
+                )
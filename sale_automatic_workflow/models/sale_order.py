@@ -52,13 +52,18 @@ class SaleOrder(models.Model):
             warning = {"title": _("Workflow Warning"), "message": workflow.warning}
             return {"warning": warning}
 
-    def _create_invoices(self, grouped=False, final=False, date=None):
+    def _deliver_service_lines(self):
+        """Deliver the manual lines of the orders whose workflow invoices the
+        services on delivery, so they can be invoiced"""
         for order in self:
             if not order.workflow_process_id.invoice_service_delivery:
                 continue
             for line in order.order_line:
                 if line.qty_delivered_method == "manual" and not line.qty_delivered:
                     line.write({"qty_delivered": line.product_uom_qty})
+
+    def _create_invoices(self, grouped=False, final=False, date=None):
+        self._deliver_service_lines()
         return super()._create_invoices(grouped=grouped, final=final, date=date)
 
     def write(self, vals):
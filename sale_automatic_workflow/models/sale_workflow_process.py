@@ -142,3 +142,17 @@ class SaleWorkflowProcess(models.Model):
     payment_filter_domain = fields.Text(
         related="payment_filter_id.domain",
     )
+    chunk_size = fields.Integer(
+        help="When set, the automatic actions are applied on chunks of this "
+        "number of records at once, falling back to one record at a time only "
+        "for a chunk that fails. Leave it to 0 to process the records one by "
+        "one.",
+    )
+
+    _sql_constraints = [
+        (
+            "chunk_size_positive",
+            "CHECK(chunk_size >= 0)",
+            "The chunk size cannot be negative.",
+        ),
+    ]
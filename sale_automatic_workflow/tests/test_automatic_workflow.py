@@ -254,3 +254,231 @@ class TestAutomaticWorkflow(TestCommon, TestAutomaticWorkflowMixin):
         self.assertIn("job bypassed", res_create_invoice)
         self.assertIn("job bypassed", res_validate_invoice)
         self.assertIn("job bypassed", res_send_invoice)
+
+    def test_full_automatic_by_chunks(self):
+        workflow = self.create_full_automatic(override={"chunk_size": 2})
+        sales = self.env["sale.order"]
+        for __ in range(3):
+            sales |= self.create_sale_order(workflow)
+        self.run_job()
+        self.assertEqual(set(sales.mapped("state")), {"sale"})
+        self.assertEqual(len(sales.invoice_ids), 3)
+        self.assertEqual(set(sales.invoice_ids.mapped("state")), {"posted"})
+        self.run_job()
+        self.assertEqual(set(sales.picking_ids.mapped("state")), {"done"})
+
+    def test_chunk_failure_fallback(self):
+        workflow = self.create_full_automatic(override={"chunk_size": 10})
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        workflow_job_cls = type(self.env["automatic.workflow.job"])
+        with mock.patch.object(
+            workflow_job_cls,
+            "_do_validate_sale_order_chunk",
+            side_effect=Exception("chunk failure"),
+        ) as mocked:
+            self.run_job()
+            mocked.assert_called_once()
+        # every order has been confirmed one by one
+        self.assertEqual(set(sales.mapped("state")), {"sale"})
+
+    def test_full_automatic_sharded(self):
+        workflow = self.create_full_automatic()
+        sale = self.create_sale_order(workflow)
+        self.env["automatic.workflow.job"].run_sharded()
+        self.assertEqual(sale.state, "sale")
+        self.assertEqual(sale.invoice_ids.state, "posted")
+        shards = self.env["automatic.workflow.shard"].search(
+            [("workflow_process_id", "=", workflow.id)]
+        )
+        self.assertEqual(
+            set(shards.mapped("step")),
+            {
+                "validate_order",
+                "validate_picking",
+                "create_invoice",
+                "validate_invoice",
+                "send_invoice",
+            },
+        )
+        self.assertEqual(set(shards.mapped("state")), {"done"})
+        # nothing left to claim
+        self.assertFalse(self.env["automatic.workflow.shard"]._claim_shard())
+
+    def test_create_invoice_by_chunks(self):
+        new_sale_journal = self.env["account.journal"].create(
+            {"name": "TTSB", "code": "TTSB", "type": "sale"}
+        )
+        workflow = self.create_full_automatic(
+            override={"chunk_size": 10, "property_journal_id": new_sale_journal.id}
+        )
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        wizard_path = (
+            "odoo.addons.sale.wizard.sale_make_invoice_advance."
+            "SaleAdvancePaymentInv.create_invoices"
+        )
+        with mock.patch(wizard_path) as mocked:
+            self.run_job()
+            mocked.assert_not_called()
+        for sale in sales:
+            # one invoice per order
+            self.assertEqual(len(sale.invoice_ids), 1)
+            invoice_lines = sale.invoice_ids.invoice_line_ids
+            self.assertEqual(invoice_lines.sale_line_ids.order_id, sale)
+            self.assertEqual(sale.invoice_ids.journal_id, new_sale_journal)
+            self.assertEqual(sale.invoice_ids.workflow_process_id, workflow)
+
+    def test_create_invoice_chunk_nothing_to_invoice(self):
+        workflow = self.create_full_automatic()
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        # nothing delivered yet on the first order
+        sales[0].order_line.product_id.invoice_policy = "delivery"
+        sales.action_confirm()
+        res = self.env["automatic.workflow.job"]._do_create_invoice_chunk(sales)
+        self.assertIn("job bypassed", res)
+        self.assertFalse(sales[0].invoice_ids)
+        self.assertTrue(sales[1].invoice_ids)
+
+    def test_create_invoice_chunk_service_delivery(self):
+        workflow = self.create_full_automatic(
+            override={"chunk_size": 10, "invoice_service_delivery": True}
+        )
+        product_service = self.env["product.product"].create(
+            {
+                "name": "Remodeling Service",
+                "type": "service",
+                "service_type": "manual",
+                "invoice_policy": "delivery",
+                "list_price": 90.0,
+            }
+        )
+        override = {
+            "order_line": [
+                (
+                    0,
+                    0,
+                    {
+                        "name": product_service.name,
+                        "product_id": product_service.id,
+                        "product_uom_qty": 2,
+                    },
+                )
+            ]
+        }
+        sales = self.env["sale.order"]
+        for __ in range(2):
+            sales |= self.create_sale_order(workflow, override=override)
+        sales.action_confirm()
+        lines = sales.order_line
+        self.assertEqual(set(lines.mapped("qty_delivered_method")), {"manual"})
+        self.assertFalse(any(lines.mapped("qty_delivered")))
+        res = self.env["automatic.workflow.job"]._do_create_invoice_chunk(sales)
+        self.assertNotIn("job bypassed", res)
+        self.assertEqual(lines.mapped("qty_delivered"), [2.0, 2.0])
+        for sale in sales:
+            self.assertEqual(len(sale.invoice_ids), 1)
+            self.assertEqual(sale.invoice_ids.invoice_line_ids.quantity, 2.0)
+
+    def test_register_payment_by_chunks(self):
+        workflow = self.create_full_automatic(
+            override={"chunk_size": 10, "register_payment": True}
+        )
+        sale = self.create_sale_order(workflow)
+        sale2 = self.create_sale_order(
+            workflow, override={"partner_id": sale.partner_id.id}
+        )
+        self.run_job()
+        invoices = (sale | sale2).invoice_ids
+        self.assertEqual(len(invoices), 2)
+        for invoice in invoices:
+            self.assertIn(invoice.payment_state, ("paid", "in_payment"))
+        # a single payment for both invoices of the partner
+        payment = invoices._get_reconciled_payments()
+        self.assertEqual(len(payment), 1)
+        self.assertEqual(payment.amount, sum(invoices.mapped("amount_total")))
+
+    def test_register_payment_chunk_refund(self):
+        partner = self.env["res.partner"].create({"name": "Refunded customer"})
+        product = self.env["product.product"].create(
+            {"name": "Bread", "list_price": 5, "taxes_id": [(5, 0, 0)]}
+        )
+        moves = self.env["account.move"].create(
+            [
+                {
+                    "move_type": move_type,
+                    "partner_id": partner.id,
+                    "invoice_line_ids": [
+                        (0, 0, {"product_id": product.id, "price_unit": 5})
+                    ],
+                }
+                for move_type in ("out_invoice", "out_invoice", "out_refund")
+            ]
+        )
+        moves.action_post()
+        self.env["automatic.workflow.job"]._register_payment_invoice_chunk(moves)
+        for move in moves:
+            self.assertIn(move.payment_state, ("paid", "in_payment"))
+        # the refund is not netted with the invoices of the partner
+        payments = moves._get_reconciled_payments()
+        self.assertEqual(len(payments), 2)
+        inbound = payments.filtered(lambda p: p.payment_type == "inbound")
+        outbound = payments - inbound
+        self.assertEqual(inbound.amount, 10)
+        self.assertEqual(outbound.amount, 5)
+
+    def test_send_invoice_by_chunks(self):
+        workflow = self.create_full_automatic(override={"chunk_size": 10})
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        self.run_job()
+        invoices = sales.invoice_ids
+        self.assertEqual(len(invoices), 2)
+        self.assertTrue(all(invoices.mapped("is_move_sent")))
+        mails = self.env["mail.mail"].search(
+            [("model", "=", "account.move"), ("res_id", "in", invoices.ids)]
+        )
+        self.assertEqual(len(mails), 2)
+        # queued, the mail queue sends them
+        self.assertEqual(set(mails.mapped("state")), {"outgoing"})
+        for invoice in invoices:
+            mail = mails.filtered(lambda m, invoice=invoice: m.res_id == invoice.id)
+            self.assertEqual(mail.recipient_ids, invoice.partner_id)
+            # the report is rendered by the mail queue
+            self.assertFalse(mail.attachment_ids)
+            self.assertTrue(mail.workflow_report_template_id)
+        mails._attach_workflow_reports()
+        for mail in mails:
+            self.assertEqual(len(mail.attachment_ids), 1)
+            self.assertEqual(mail.attachment_ids.res_id, mail.res_id)
+            self.assertFalse(mail.workflow_report_template_id)
+
+    def test_send_invoice_chunk_without_template(self):
+        workflow = self.create_full_automatic(override={"send_invoice": False})
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        self.run_job()
+        invoices = sales.invoice_ids
+        self.assertEqual(len(invoices), 2)
+        with mock.patch.object(
+            type(invoices),
+            "_get_mail_template",
+            return_value="sale_automatic_workflow.missing_template",
+        ):
+            res = self.env["automatic.workflow.job"]._do_send_invoice_chunk(invoices)
+        self.assertIn("0 invoice mails", res)
+        # no mail, the invoices are not marked as sent
+        self.assertFalse(any(invoices.mapped("is_move_sent")))
+
+    def test_run_log(self):
+        workflow = self.create_full_automatic()
+        self.create_sale_order(workflow)
+        self.create_sale_order(workflow)
+        self.run_job()
+        logs = self.env["automatic.workflow.run.log"].search(
+            [("workflow_process_id", "=", workflow.id)]
+        )
+        log = logs.filtered(lambda log: log.step == "validate_order")
+        self.assertEqual(log.scanned_count, 2)
+        self.assertEqual(log.processed_count, 2)
+        self.assertFalse(log.bypassed_count)
+        self.assertFalse(log.failed_count)
+        self.assertFalse(log.delayed_count)
+        self.assertTrue(log.query_count)
+        self.assertEqual(len(logs.mapped("run_date")), 1)
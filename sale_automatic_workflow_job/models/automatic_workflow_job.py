@@ -1,8 +1,24 @@
 # Copyright 2020 Camptocamp (https://www.camptocamp.com)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+import hashlib
+from collections import Counter
+
 from odoo import _, models
 
-from odoo.addons.queue_job.job import identity_exact
+from odoo.addons.queue_job.job import Job, identity_exact
+
+
+def identity_chunk(job_):
+    """Identity of a job processing a chunk of records, whatever the order
+    of the records in the chunk"""
+    records = job_.args[0]
+    hasher = hashlib.sha1()
+    hasher.update(job_.model_name.encode("utf-8"))
+    hasher.update(job_.method_name.encode("utf-8"))
+    hasher.update(records._name.encode("utf-8"))
+    hasher.update(str(sorted(records.ids)).encode("utf-8"))
+    hasher.update(str(job_.args[1:]).encode("utf-8"))
+    return hasher.hexdigest()
 
 
 class AutomaticWorkflowJob(models.Model):
@@ -15,6 +31,15 @@ class AutomaticWorkflowJob(models.Model):
             "identity_key": identity_exact,
         }
 
+    def _do_validate_sale_order_and_mail_job_options(
+        self, sale, domain_filter, send_mail=None
+    ):
+        description = _("Validate sales order {}").format(sale.display_name)
+        return {
+            "description": description,
+            "identity_key": identity_exact,
+        }
+
     def _validate_sale_orders(self, domain_filter):
         with_context = self.with_context(auto_delay_do_validation=True)
         return super(AutomaticWorkflowJob, with_context)._validate_sale_orders(
@@ -45,6 +70,22 @@ class AutomaticWorkflowJob(models.Model):
             domain_filter
         )
 
+    def _do_send_invoice_job_options(self, invoice, domain_filter):
+        description = _("Send invoice {}").format(invoice.display_name)
+        return {
+            "description": description,
+            "identity_key": identity_exact,
+        }
+
+    def _do_register_payment_job_options(self, invoice, domain_filter):
+        description = _("Register payment of invoice {}").format(
+            invoice.display_name
+        )
+        return {
+            "description": description,
+            "identity_key": identity_exact,
+        }
+
     def _do_validate_picking_job_options(self, picking, domain_filter):
         description = _("Validate transfer {}").format(picking.display_name)
         return {
@@ -69,6 +110,64 @@ class AutomaticWorkflowJob(models.Model):
         with_context = self.with_context(auto_delay_do_sale_done=True)
         return super(AutomaticWorkflowJob, with_context)._sale_done(domain_filter)
 
+    def _run_chunk_job_options(
+        self, records, domain_filter, chunk_method, record_method
+    ):
+        description = _("Automatic workflow on {} {}").format(
+            len(records), records._description
+        )
+        return {
+            "description": description,
+            "identity_key": identity_chunk,
+        }
+
+    def _dispatch_chunk(self, records, domain_filter, chunk_method, record_method):
+        """Process the chunk in a job"""
+        if self.env.context.get("queue_job__no_delay"):
+            return super()._dispatch_chunk(
+                records, domain_filter, chunk_method, record_method
+            )
+        job_options = self._run_chunk_job_options(
+            records, domain_filter, chunk_method, record_method
+        )
+        self.with_delay(**job_options)._run_chunk(
+            records, domain_filter, chunk_method, record_method
+        )
+        return Counter(delayed=len(records))
+
+    def _get_record_outcome(self, res):
+        if isinstance(res, Job):
+            return "delayed"
+        return super()._get_record_outcome(res)
+
+    def _job_prepare_context_before_enqueue_keys(self):
+        # the chunk jobs send the confirmation mails of the sales orders
+        return super()._job_prepare_context_before_enqueue_keys() + (
+            "send_order_confirmation_mail",
+        )
+
+    def _run_chunk_fallback_kwargs(self, record_method):
+        """Keyword arguments of the jobs of ``record_method``, the context
+        of the current step is not kept by the jobs"""
+        if record_method == "_do_validate_sale_order_and_mail":
+            send_mail = self.env.context.get("send_order_confirmation_mail")
+            return {"send_mail": bool(send_mail)}
+        return {}
+
+    def _run_chunk_fallback(self, records, domain_filter, record_method):
+        """Split a failed chunk into one job per record"""
+        if self.env.context.get("queue_job__no_delay"):
+            return super()._run_chunk_fallback(records, domain_filter, record_method)
+        kwargs = self._run_chunk_fallback_kwargs(record_method)
+        for record in records:
+            job_options = {}
+            options_method = getattr(self, record_method + "_job_options", None)
+            if options_method:
+                job_options = options_method(record, domain_filter, **kwargs)
+            delayable = self.with_delay(**job_options)
+            getattr(delayable, record_method)(record, domain_filter, **kwargs)
+        return Counter(delayed=len(records))
+
     def _register_hook(self):
         mapping = {
             "_do_validate_sale_order": "auto_delay_do_validation",
@@ -15,7 +15,11 @@ class QueueJob(models.Model):
             "name": _("Sale Automatic Workflow Job"),
             "type": "ir.actions.act_window",
             "res_model": obj._name,
-            "view_mode": "form",
-            "res_id": obj.id,
         }
+        if len(obj) == 1:
+            action.update({"view_mode": "form", "res_id": obj.id})
+        else:
+            action.update(
+                {"view_mode": "tree,form", "domain": [("id", "in", obj.ids)]}
+            )
         return action
@@ -1,6 +1,8 @@
 # Copyright 2020 Camptocamp (https://www.camptocamp.com)
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from unittest import mock
+
 from odoo.tests import tagged
 
 from odoo.addons.queue_job.job import identity_exact
@@ -10,6 +12,8 @@ from odoo.addons.sale_automatic_workflow.tests.common import (
     TestCommon,
 )
 
+from ..models.automatic_workflow_job import identity_chunk
+
 
 @tagged("post_install", "-at_install")
 class TestAutoWorkflowJob(TestCommon, TestAutomaticWorkflowMixin):
@@ -136,3 +140,116 @@ class TestAutoWorkflowJob(TestCommon, TestAutomaticWorkflowMixin):
                 ],
             )
             self.assert_job_delayed(delayable_cls, delayable, "_do_sale_done", args)
+
+    def test_validate_sale_order_by_chunks(self):
+        workflow = self.create_full_automatic(override={"chunk_size": 10})
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        with mock_with_delay() as (delayable_cls, delayable):
+            self.run_job()  # run automatic workflow cron
+            # a single job for both orders
+            self.assertEqual(delayable_cls.call_count, 1)
+            delay_args, delay_kwargs = delayable_cls.call_args
+            self.assertEqual(delay_kwargs.get("identity_key"), identity_chunk)
+            self.assertEqual(delayable._run_chunk.call_count, 1)
+            delay_args, delay_kwargs = delayable._run_chunk.call_args
+            self.assertEqual(delay_args[0], sales)
+            self.assertEqual(
+                delay_args[2:],
+                ("_do_validate_sale_order_chunk", "_do_validate_sale_order_and_mail"),
+            )
+
+    def test_chunk_failure_split_in_jobs(self):
+        workflow = self.create_full_automatic()
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        workflow_job = self.env["automatic.workflow.job"]
+        domain_filter = [("state", "=", "draft")]
+        with mock.patch.object(
+            type(workflow_job),
+            "_do_validate_sale_order_chunk",
+            side_effect=Exception("chunk failure"),
+        ), mock_with_delay() as (delayable_cls, delayable):
+            workflow_job._run_chunk(
+                sales,
+                domain_filter,
+                "_do_validate_sale_order_chunk",
+                "_do_validate_sale_order",
+            )
+            # one job per order of the failed chunk
+            self.assertEqual(delayable_cls.call_count, 2)
+            self.assertEqual(delayable._do_validate_sale_order.call_count, 2)
+            calls = delayable._do_validate_sale_order.call_args_list
+            self.assertEqual({call[0][0] for call in calls}, set(sales))
+
+    def test_chunk_failure_validate_and_mail_jobs(self):
+        workflow = self.create_full_automatic()
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        workflow_job = self.env["automatic.workflow.job"].with_context(
+            send_order_confirmation_mail=True
+        )
+        domain_filter = [("state", "=", "draft")]
+        with mock.patch.object(
+            type(workflow_job),
+            "_do_validate_sale_order_chunk",
+            side_effect=Exception("chunk failure"),
+        ), mock_with_delay() as (delayable_cls, delayable):
+            workflow_job._run_chunk(
+                sales,
+                domain_filter,
+                "_do_validate_sale_order_chunk",
+                "_do_validate_sale_order_and_mail",
+            )
+            self.assertEqual(delayable_cls.call_count, 2)
+            for __, delay_kwargs in delayable_cls.call_args_list:
+                self.assertEqual(delay_kwargs.get("identity_key"), identity_exact)
+            calls = delayable._do_validate_sale_order_and_mail.call_args_list
+            self.assertEqual({call[0][0] for call in calls}, set(sales))
+            # the mail is not lost with the context of the step
+            for call in calls:
+                self.assertDictEqual(call[1], {"send_mail": True})
+        job_function = self.env.ref(
+            "sale_automatic_workflow_job.job_function_do_validate_sale_order_and_mail"
+        )
+        self.assertEqual(
+            job_function.channel_id,
+            self.env.ref("sale_automatic_workflow_job.channel_sale_automatic_workflow"),
+        )
+
+    def test_run_by_chunks_no_duplicate_job(self):
+        workflow = self.create_full_automatic(override={"chunk_size": 2})
+        sales = self.create_sale_order(workflow) | self.create_sale_order(workflow)
+        self.run_job()  # run automatic workflow cron
+        # a new order comes in before the job of the first chunk is done
+        sales |= self.create_sale_order(workflow)
+        self.run_job()
+        jobs = self.env["queue.job"].search(
+            [
+                ("model_name", "=", "automatic.workflow.job"),
+                ("method_name", "=", "_run_chunk"),
+            ]
+        )
+        # the first chunk is not enqueued again, only the new order is
+        self.assertEqual(len(jobs), 2)
+        chunks = [job.args[0] for job in jobs]
+        self.assertEqual(sorted(len(chunk) for chunk in chunks), [1, 2])
+        self.assertEqual(chunks[0] | chunks[1], sales)
+
+    def test_run_log_delayed(self):
+        workflow = self.create_full_automatic()
+        chunk_workflow = self.create_full_automatic(override={"chunk_size": 10})
+        self.create_sale_order(workflow)
+        for __ in range(3):
+            self.create_sale_order(chunk_workflow)
+        self.run_job()  # run automatic workflow cron
+        logs = self.env["automatic.workflow.run.log"].search(
+            [
+                ("workflow_process_id", "in", (workflow | chunk_workflow).ids),
+                ("step", "=", "validate_order"),
+            ]
+        )
+        self.assertEqual(len(logs), 2)
+        for log in logs:
+            expected = 1 if log.workflow_process_id == workflow else 3
+            self.assertEqual(log.scanned_count, expected)
+            # handed over to jobs, not processed yet
+            self.assertEqual(log.delayed_count, expected)
+            self.assertFalse(log.processed_count)
@@ -30,3 +30,16 @@ class AutomaticWorkflowJob(models.Model):
             )
             return
         return super()._register_payment_invoice(invoice)
+
+    def _register_payment_invoice_chunk(self, invoices):
+        without_journal = invoices.filtered(
+            lambda invoice: not invoice.payment_mode_id.fixed_journal_id
+        )
+        for invoice in without_journal:
+            _logger.debug(
+                "Unable to Register Payment for invoice %s: "
+                "Payment mode %s must have fixed journal",
+                invoice.id,
+                invoice.payment_mode_id.id,
+            )
+        return super()._register_payment_invoice_chunk(invoices - without_journal)
@@ -98,3 +98,25 @@ class TestAutomaticWorkflowPaymentMode(TestCommon, TestAutomaticWorkflowMixin):
         self.assertEqual(invoice.payment_state, "paid")
         picking = sale.picking_ids
         self.assertEqual(picking.state, "done")
+
+    def test_register_payment_by_chunks(self):
+        workflow = self.create_full_automatic(override={"chunk_size": 10})
+        pay_mode_variable = self.env["account.payment.mode"].create(
+            {
+                "name": "Julius Caesare variable payment",
+                "bank_account_link": "variable",
+                "payment_method_id": self.pay_method.id,
+                "workflow_process_id": workflow.id,
+            }
+        )
+        sale = self.create_sale_order(workflow)
+        sale.payment_mode_id = self.pay_mode
+        sale2 = self.create_sale_order(workflow)
+        sale2.payment_mode_id = pay_mode_variable
+        self.env["automatic.workflow.job"].run()
+        # the invoice without fixed journal is skipped, not the whole chunk
+        self.assertEqual(sale.invoice_ids.payment_state, "paid")
+        self.assertEqual(sale2.invoice_ids.state, "posted")
+        self.assertEqual(sale2.invoice_ids.payment_state, "not_paid")
+        payment = sale.invoice_ids._get_reconciled_payments()
+        self.assertEqual(payment.journal_id, self.acc_journ)
@@ -1,9 +1,11 @@
 # Copyright 2018 ACSONE SA/NV
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import SUPERUSER_ID, _, api, fields, models
 from odoo.exceptions import UserError
-from odoo.tools import float_is_zero
+from odoo.tools import float_is_zero, float_round
 from odoo.tools.misc import format_date
 
 from odoo.addons.sale.models.sale_order import READONLY_FIELD_STATES
@@ -90,6 +92,7 @@ class BlanketOrder(models.Model):
         compute="_compute_state",
         store=True,
         copy=False,
+        index=True,
     )
     validity_date = fields.Date(
         states=READONLY_FIELD_STATES,
@@ -209,12 +212,30 @@ class BlanketOrder(models.Model):
                 order.state = "open"
 
     def _compute_uom_qty(self):
+        fnames = [
+            "original_uom_qty",
+            "ordered_uom_qty",
+            "invoiced_uom_qty",
+            "delivered_uom_qty",
+            "remaining_uom_qty",
+        ]
+        totals = {}
+        orders = self.filtered("id")
+        if orders:
+            groups = self.env["sale.blanket.order.line"].read_group(
+                [("order_id", "in", orders.ids)],
+                ["order_id"] + ["%s:sum" % fname for fname in fnames],
+                ["order_id"],
+            )
+            totals = {group["order_id"][0]: group for group in groups}
         for bo in self:
-            bo.original_uom_qty = sum(bo.mapped("line_ids.original_uom_qty"))
-            bo.ordered_uom_qty = sum(bo.mapped("line_ids.ordered_uom_qty"))
-            bo.invoiced_uom_qty = sum(bo.mapped("line_ids.invoiced_uom_qty"))
-            bo.delivered_uom_qty = sum(bo.mapped("line_ids.delivered_uom_qty"))
-            bo.remaining_uom_qty = sum(bo.mapped("line_ids.remaining_uom_qty"))
+            if bo.id:
+                bo_totals = totals.get(bo.id, {})
+                for fname in fnames:
+                    bo[fname] = bo_totals.get(fname) or 0.0
+            else:
+                for fname in fnames:
+                    bo[fname] = sum(bo.line_ids.mapped(fname))
 
     @api.onchange("partner_id")
     def onchange_partner_id(self):
@@ -465,8 +486,13 @@ class BlanketOrderLine(models.Model):
     company_id = fields.Many2one(
         related="order_id.company_id", store=True, index=True, precompute=True
     )
-    currency_id = fields.Many2one("res.currency", related="order_id.currency_id")
-    partner_id = fields.Many2one(related="order_id.partner_id", string="Customer")
+    # Stored to look up the lines to assign to the sale order lines
+    currency_id = fields.Many2one(
+        "res.currency", related="order_id.currency_id", store=True
+    )
+    partner_id = fields.Many2one(
+        related="order_id.partner_id", string="Customer", store=True
+    )
     user_id = fields.Many2one(related="order_id.user_id", string="Responsible")
     payment_term_id = fields.Many2one(
         related="order_id.payment_term_id", string="Payment Terms"
@@ -484,6 +510,15 @@ class BlanketOrderLine(models.Model):
         help="Technical field for UX purpose.",
     )
 
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS sale_blanket_order_line_assign_idx
+            ON sale_blanket_order_line
+            (product_id, currency_id, partner_id, date_schedule)
+            """
+        )
+
     def name_get(self):
         result = []
         if self.env.context.get("from_sale_order"):
@@ -634,28 +669,84 @@ class BlanketOrderLine(models.Model):
         "product_uom",
     )
     def _compute_quantities(self):
+        # The quantities of the stored lines are aggregated by the database,
+        # the ones of the lines being edited from their sale lines in cache.
+        quantities = self.filtered("id")._get_sale_lines_quantities()
         for line in self:
-            sale_lines = line.sale_lines
-            line.ordered_uom_qty = sum(
-                sl.product_uom._compute_quantity(sl.product_uom_qty, line.product_uom)
-                for sl in sale_lines
-                if sl.order_id.state != "cancel" and sl.product_id == line.product_id
-            )
-            line.invoiced_uom_qty = sum(
-                sl.product_uom._compute_quantity(sl.qty_invoiced, line.product_uom)
-                for sl in sale_lines
-                if sl.order_id.state != "cancel" and sl.product_id == line.product_id
-            )
-            line.delivered_uom_qty = sum(
-                sl.product_uom._compute_quantity(sl.qty_delivered, line.product_uom)
-                for sl in sale_lines
-                if sl.order_id.state != "cancel" and sl.product_id == line.product_id
-            )
+            if line.id:
+                ordered_qty, invoiced_qty, delivered_qty = quantities.get(
+                    line.id, (0.0, 0.0, 0.0)
+                )
+            else:
+                sale_lines = line.sale_lines.filtered(
+                    lambda sl: sl.order_id.state != "cancel"
+                    and sl.product_id == line.product_id
+                )
+                ordered_qty, invoiced_qty, delivered_qty = (
+                    sum(
+                        sl.product_uom._compute_quantity(sl[fname], line.product_uom)
+                        for sl in sale_lines
+                    )
+                    for fname in ("product_uom_qty", "qty_invoiced", "qty_delivered")
+                )
+            line.ordered_uom_qty = ordered_qty
+            line.invoiced_uom_qty = invoiced_qty
+            line.delivered_uom_qty = delivered_qty
             line.remaining_uom_qty = line.original_uom_qty - line.ordered_uom_qty
             line.remaining_qty = line.product_uom._compute_quantity(
                 line.remaining_uom_qty, line.product_id.uom_id
             )
 
+    def _get_sale_lines_quantities(self):
+        """Return a dictionary {blanket line id: (ordered, invoiced, delivered)}
+        with the quantities of the sale lines not cancelled, converted to the
+        unit of measure of the blanket lines.
+        """
+        if not self:
+            return {}
+        self.env["sale.order.line"].flush_model(
+            [
+                "blanket_order_line",
+                "order_id",
+                "product_id",
+                "product_uom",
+                "product_uom_qty",
+                "qty_delivered",
+                "qty_invoiced",
+            ]
+        )
+        self.env["sale.order"].flush_model(["state"])
+        self.env["uom.uom"].flush_model(["factor", "rounding"])
+        self.flush_recordset(["product_id", "product_uom"])
+        quantities = defaultdict(lambda: (0.0, 0.0, 0.0))
+        for sub_ids in self.env.cr.split_for_in_conditions(self.ids):
+            self.env.cr.execute(
+                """
+                SELECT bol.id, bol_uom.rounding,
+                    sol.product_uom_qty / sol_uom.factor * bol_uom.factor,
+                    sol.qty_invoiced / sol_uom.factor * bol_uom.factor,
+                    sol.qty_delivered / sol_uom.factor * bol_uom.factor
+                FROM sale_blanket_order_line bol
+                JOIN uom_uom bol_uom ON bol_uom.id = bol.product_uom
+                JOIN sale_order_line sol ON sol.blanket_order_line = bol.id
+                    AND sol.product_id = bol.product_id
+                JOIN uom_uom sol_uom ON sol_uom.id = sol.product_uom
+                JOIN sale_order so ON so.id = sol.order_id
+                WHERE bol.id IN %s AND so.state != 'cancel'
+                """,
+                (sub_ids,),
+            )
+            for line_id, rounding, *sale_line_quantities in self.env.cr.fetchall():
+                # Each sale line is rounded as uom.uom._compute_quantity does
+                quantities[line_id] = tuple(
+                    total
+                    + float_round(
+                        qty or 0.0, precision_rounding=rounding, rounding_method="UP"
+                    )
+                    for total, qty in zip(quantities[line_id], sale_line_quantities)
+                )
+        return dict(quantities)
+
     def _validate(self):
         try:
             for line in self:
@@ -1,7 +1,9 @@
 # Copyright 2018 ACSONE SA/NV
 # Copyright 2019 Eficent and IT Consulting Services, S.L.
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from collections import defaultdict
 from datetime import date, timedelta
+from operator import itemgetter
 
 from odoo import _, api, fields, models
 from odoo.exceptions import ValidationError
@@ -55,22 +57,13 @@ class SaleOrderLine(models.Model):
         "sale.blanket.order.line", string="Blanket Order line", copy=False
     )
 
-    def _get_assigned_bo_line(self, bo_lines):
-        # We get the blanket order line with enough quantity and closest
-        # scheduled date
-        assigned_bo_line = False
-        date_planned = date.today()
-        date_delta = timedelta(days=365)
-        for line in bo_lines.filtered(lambda l: l.date_schedule):
-            date_schedule = line.date_schedule
-            if date_schedule and abs(date_schedule - date_planned) < date_delta:
-                assigned_bo_line = line
-                date_delta = abs(date_schedule - date_planned)
-        if assigned_bo_line:
-            return assigned_bo_line
-        non_date_bo_lines = bo_lines.filtered(lambda l: not l.date_schedule)
-        if non_date_bo_lines:
-            return non_date_bo_lines[0]
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        # The imported lines don't go through the onchanges
+        if self.env.context.get("import_file"):
+            lines._assign_blanket_order_lines()
+        return lines
 
     def _get_eligible_bo_lines_domain(self, base_qty):
         filters = [
@@ -83,26 +76,122 @@ class SaleOrderLine(models.Model):
             filters.append(("partner_id", "=", self.order_id.partner_id.id))
         return filters
 
-    def _get_eligible_bo_lines(self):
-        base_qty = self.product_uom._compute_quantity(
+    def _get_bo_base_qty(self):
+        return self.product_uom._compute_quantity(
             self.product_uom_qty, self.product_id.uom_id
         )
-        filters = self._get_eligible_bo_lines_domain(base_qty)
-        return self.env["sale.blanket.order.line"].search(filters)
+
+    @api.model
+    def _get_bo_line_priority(self, bo_line, date_planned):
+        """Sort key of the blanket order lines to assign: the closest
+        scheduled date in a year first, then the lines without scheduled date.
+        None for the lines scheduled further.
+        """
+        if not bo_line.date_schedule:
+            return (1, timedelta(), bo_line.id)
+        date_delta = abs(bo_line.date_schedule - date_planned)
+        if date_delta >= timedelta(days=365):
+            return None
+        return (0, date_delta, bo_line.id)
+
+    def _search_assigned_bo_line(self, filters):
+        """Search the blanket order line to assign among the ones of the
+        filters, with the closest scheduled date in a year or else the first
+        one without scheduled date, without reading all of them.
+        """
+        bo_line_obj = self.env["sale.blanket.order.line"]
+        date_planned = date.today()
+        date_delta = timedelta(days=365)
+        bo_lines = bo_line_obj.search(
+            filters
+            + [
+                ("date_schedule", ">=", date_planned),
+                ("date_schedule", "<", date_planned + date_delta),
+            ],
+            order="date_schedule, id",
+            limit=1,
+        ) | bo_line_obj.search(
+            filters
+            + [
+                ("date_schedule", "<", date_planned),
+                ("date_schedule", ">", date_planned - date_delta),
+            ],
+            order="date_schedule desc, id",
+            limit=1,
+        )
+        if bo_lines:
+            return min(
+                bo_lines,
+                key=lambda bo_line: self._get_bo_line_priority(bo_line, date_planned),
+            )
+        return bo_line_obj.search(
+            filters + [("date_schedule", "=", False)], order="id", limit=1
+        )
 
     def get_assigned_bo_line(self):
         self.ensure_one()
-        eligible_bo_lines = self._get_eligible_bo_lines()
-        if eligible_bo_lines:
-            if (
-                not self.blanket_order_line
-                or self.blanket_order_line not in eligible_bo_lines
-            ):
-                self.blanket_order_line = self._get_assigned_bo_line(eligible_bo_lines)
-        else:
-            self.blanket_order_line = False
+        filters = self._get_eligible_bo_lines_domain(self._get_bo_base_qty())
+        bo_line_obj = self.env["sale.blanket.order.line"]
+        if not self.blanket_order_line or not bo_line_obj.search(
+            filters + [("id", "=", self.blanket_order_line.id)], limit=1
+        ):
+            self.blanket_order_line = self._search_assigned_bo_line(filters)
         self.onchange_blanket_order_line()
-        return {"domain": {"blanket_order_line": [("id", "in", eligible_bo_lines.ids)]}}
+        return {"domain": {"blanket_order_line": filters}}
+
+    def _assign_blanket_order_lines(self):
+        """Assign in one pass the blanket order lines to the lines without
+        one, e.g. the lines of imported orders, as the product onchange does
+        line by line. The quantities assigned to the previous lines are
+        discounted from the remaining quantity of the blanket order lines.
+        """
+        so_lines = self.filtered(
+            lambda sl: sl.product_id
+            and not sl.display_type
+            and not sl.blanket_order_line
+        )
+        if not so_lines:
+            return
+        # The candidates of the lines with the same eligibility domain are
+        # searched once, any quantity being checked below.
+        so_lines_by_domain = defaultdict(lambda: self.browse())
+        domains = {}
+        for so_line in so_lines:
+            domain = so_line._get_eligible_bo_lines_domain(0.0)
+            domains[str(domain)] = domain
+            so_lines_by_domain[str(domain)] |= so_line
+        date_planned = date.today()
+        bo_line_obj = self.env["sale.blanket.order.line"]
+        remaining_qty = {}
+        so_line_ids_by_assign_key = defaultdict(list)
+        for domain_key, domain_so_lines in so_lines_by_domain.items():
+            candidates = []
+            for bo_line in bo_line_obj.search(domains[domain_key]):
+                priority = self._get_bo_line_priority(bo_line, date_planned)
+                if priority is not None:
+                    candidates.append((priority, bo_line))
+                    remaining_qty.setdefault(bo_line.id, bo_line.remaining_qty)
+            candidates.sort(key=itemgetter(0))
+            for so_line in domain_so_lines:
+                base_qty = so_line._get_bo_base_qty()
+                for _priority, bo_line in candidates:
+                    if remaining_qty[bo_line.id] >= base_qty:
+                        remaining_qty[bo_line.id] -= base_qty
+                        assign_key = (bo_line, so_line.product_uom)
+                        so_line_ids_by_assign_key[assign_key].append(so_line.id)
+                        break
+        for (bo_line, uom), so_line_ids in so_line_ids_by_assign_key.items():
+            vals = {"blanket_order_line": bo_line.id}
+            # Same price and taxes as the blanket order line onchange
+            if bo_line.product_uom != uom:
+                vals["price_unit"] = bo_line.product_uom._compute_price(
+                    bo_line.price_unit, uom
+                )
+            else:
+                vals["price_unit"] = bo_line.price_unit
+            if bo_line.taxes_id:
+                vals["tax_id"] = [(6, 0, bo_line.taxes_id.ids)]
+            self.browse(so_line_ids).write(vals)
 
     @api.onchange("product_id", "order_partner_id")
     def onchange_product_id(self):
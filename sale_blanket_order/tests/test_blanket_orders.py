@@ -424,3 +424,110 @@ class TestSaleBlanketOrders(common.TransactionCase):
         view_action = blanket_order.action_view_sale_orders()
         domain_ids = view_action["domain"][0][2]
         self.assertEqual(len(domain_ids), 3)
+
+    def test_07_blanket_order_quantities_different_uom(self):
+        """The quantities of the sale lines are converted to the unit of
+        measure of the blanket order line, the cancelled orders not counted"""
+        blanket_order = self.blanket_order_obj.create(
+            {
+                "partner_id": self.partner.id,
+                "validity_date": fields.Date.to_string(self.tomorrow),
+                "payment_term_id": self.payment_term.id,
+                "pricelist_id": self.sale_pricelist.id,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.product.id,
+                            "product_uom": self.uom_dozen.id,
+                            "original_uom_qty": 2.0,
+                            "price_unit": 240.0,
+                        },
+                    )
+                ],
+            }
+        )
+        blanket_order.sudo().onchange_partner_id()
+        blanket_order.sudo().action_confirm()
+        bo_line = blanket_order.line_ids
+        sale_orders = self.so_obj.create(
+            [
+                {
+                    "partner_id": self.partner.id,
+                    "pricelist_id": self.sale_pricelist.id,
+                    "order_line": [
+                        (
+                            0,
+                            0,
+                            {
+                                "product_id": self.product.id,
+                                "product_uom": self.product.uom_id.id,
+                                "product_uom_qty": qty,
+                                "price_unit": 20.0,
+                                "blanket_order_line": bo_line.id,
+                            },
+                        )
+                    ],
+                }
+                for qty in (6.0, 12.0)
+            ]
+        )
+        self.assertEqual(bo_line.ordered_uom_qty, 1.5)
+        self.assertEqual(bo_line.remaining_uom_qty, 0.5)
+        self.assertEqual(bo_line.remaining_qty, 6.0)
+        self.assertEqual(blanket_order.ordered_uom_qty, 1.5)
+        sale_orders[1].action_cancel()
+        self.assertEqual(bo_line.ordered_uom_qty, 0.5)
+        self.assertEqual(blanket_order.remaining_uom_qty, 1.5)
+
+    def test_08_blanket_order_quantities_rounding(self):
+        """Every sale line is rounded up to the rounding of the unit of
+        measure of the blanket order line before being summed"""
+        self.uom_dozen.rounding = 1.0
+        blanket_order = self.blanket_order_obj.create(
+            {
+                "partner_id": self.partner.id,
+                "validity_date": fields.Date.to_string(self.tomorrow),
+                "payment_term_id": self.payment_term.id,
+                "pricelist_id": self.sale_pricelist.id,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.product.id,
+                            "product_uom": self.uom_dozen.id,
+                            "original_uom_qty": 3.0,
+                            "price_unit": 240.0,
+                        },
+                    )
+                ],
+            }
+        )
+        blanket_order.sudo().onchange_partner_id()
+        blanket_order.sudo().action_confirm()
+        bo_line = blanket_order.line_ids
+        self.so_obj.create(
+            {
+                "partner_id": self.partner.id,
+                "pricelist_id": self.sale_pricelist.id,
+                "order_line": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.product.id,
+                            "product_uom": self.product.uom_id.id,
+                            "product_uom_qty": 1.0,
+                            "price_unit": 20.0,
+                            "blanket_order_line": bo_line.id,
+                        },
+                    )
+                    for __ in range(2)
+                ],
+            }
+        )
+        # 1 unit is rounded up to 1 dozen for each line, not 2 units once
+        self.assertEqual(bo_line.ordered_uom_qty, 2.0)
+        self.assertEqual(bo_line.remaining_uom_qty, 1.0)
@@ -147,7 +147,12 @@ class TestSaleOrder(common.TransactionCase):
         so_line = so.order_line[0]
         so_line.with_context(from_sale_order=True).name_get()
         so_line.onchange_product_id()
-        self.assertEqual(so_line._get_eligible_bo_lines(), bo_lines)
+        self.assertEqual(
+            self.blanket_order_line_obj.search(
+                so_line._get_eligible_bo_lines_domain(so_line._get_bo_base_qty())
+            ),
+            bo_lines,
+        )
         bo_line_assigned = self.blanket_order_line_obj.search(
             [("date_schedule", "=", fields.Date.to_string(self.date_schedule_1))]
         )
@@ -183,7 +188,9 @@ class TestSaleOrder(common.TransactionCase):
         so_line.with_context(from_sale_order=True).name_get()
         so_line.onchange_product_id()
         self.assertEqual(
-            so_line._get_eligible_bo_lines(),
+            self.blanket_order_line_obj.search(
+                so_line._get_eligible_bo_lines_domain(so_line._get_bo_base_qty())
+            ),
             bo_lines.filtered(lambda l: l.product_id == self.product),
         )
         bo_line_assigned = self.blanket_order_line_obj.search(
@@ -194,3 +201,113 @@ class TestSaleOrder(common.TransactionCase):
             ]
         )
         self.assertEqual(so_line.blanket_order_line, bo_line_assigned)
+
+    def test_03_assign_blanket_order_lines(self):
+        blanket_order = self.create_blanket_order_01()
+        blanket_order.sudo().action_confirm()
+        bo_line_1, bo_line_2 = blanket_order.line_ids.sorted("date_schedule")
+        tax = self.env["account.tax"].create(
+            {"name": "Test Tax 10%", "amount": 10.0, "type_tax_use": "sale"}
+        )
+        bo_line_1.taxes_id = tax
+        bo_line_2.price_unit = 25.0
+        so = self.sale_order_obj.create(
+            {
+                "partner_id": self.partner.id,
+                "pricelist_id": self.sale_pricelist.id,
+                "order_line": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": self.product.name,
+                            "product_id": self.product.id,
+                            "product_uom_qty": qty,
+                            "product_uom": self.product.uom_id.id,
+                            "price_unit": 10.0,
+                        },
+                    )
+                    for qty in (15.0, 10.0, 5.0)
+                ],
+            }
+        )
+        self.assertFalse(so.order_line.blanket_order_line)
+        so.order_line._assign_blanket_order_lines()
+        # The closest scheduled date first, while it has enough quantity
+        self.assertEqual(so.order_line[0].blanket_order_line, bo_line_1)
+        self.assertEqual(so.order_line[1].blanket_order_line, bo_line_2)
+        self.assertEqual(so.order_line[2].blanket_order_line, bo_line_1)
+        # The price and taxes of the blanket order lines, as the onchange
+        self.assertEqual(so.order_line.mapped("price_unit"), [30.0, 25.0, 30.0])
+        self.assertEqual(so.order_line[0].tax_id, tax)
+        self.assertEqual(so.order_line[2].tax_id, tax)
+
+    def test_04_get_assigned_bo_line_eligibility(self):
+        blanket_order = self.create_blanket_order_01()
+        blanket_order.sudo().action_confirm()
+        bo_line_1, bo_line_2 = blanket_order.line_ids.sorted("date_schedule")
+        so = self.sale_order_obj.create(
+            {
+                "partner_id": self.partner.id,
+                "order_line": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": self.product.name,
+                            "product_id": self.product.id,
+                            "product_uom_qty": 5.0,
+                            "product_uom": self.product.uom_id.id,
+                            "price_unit": 10.0,
+                            "blanket_order_line": bo_line_2.id,
+                        },
+                    )
+                ],
+            }
+        )
+        so_line = so.order_line
+        res = so_line.get_assigned_bo_line()
+        # An eligible blanket order line is kept
+        self.assertEqual(so_line.blanket_order_line, bo_line_2)
+        self.assertEqual(
+            res["domain"]["blanket_order_line"],
+            so_line._get_eligible_bo_lines_domain(5.0),
+        )
+        self.assertEqual(
+            self.blanket_order_line_obj.search(res["domain"]["blanket_order_line"]),
+            bo_line_1 | bo_line_2,
+        )
+        # A blanket order line without enough quantity is replaced
+        bo_line_2.original_uom_qty = 4.0
+        so_line.get_assigned_bo_line()
+        self.assertEqual(so_line.blanket_order_line, bo_line_1)
+        # And removed when no blanket order line is eligible
+        so_line.product_uom_qty = 50.0
+        so_line.get_assigned_bo_line()
+        self.assertFalse(so_line.blanket_order_line)
+
+    def test_05_import_assign_blanket_order_lines(self):
+        blanket_order = self.create_blanket_order_01()
+        blanket_order.sudo().action_confirm()
+        bo_line_1 = blanket_order.line_ids.sorted("date_schedule")[0]
+        so = self.sale_order_obj.with_context(import_file=True).create(
+            {
+                "partner_id": self.partner.id,
+                "pricelist_id": self.sale_pricelist.id,
+                "order_line": [
+                    (
+                        0,
+                        0,
+                        {
+                            "name": self.product.name,
+                            "product_id": self.product.id,
+                            "product_uom_qty": 5.0,
+                            "product_uom": self.product.uom_id.id,
+                            "price_unit": 10.0,
+                        },
+                    )
+                ],
+            }
+        )
+        self.assertEqual(so.order_line.blanket_order_line, bo_line_1)
+        self.assertEqual(so.order_line.price_unit, 30.0)
@@ -1,6 +1,8 @@
 # Copyright 2018 Tecnativa - Sergio Teruel
 # Copyright 2019 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+from collections import defaultdict
+
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 
@@ -22,23 +24,56 @@ class SaleOrder(models.Model):
         :param qty:
         :return: the sale order line record created
         """
+        return self._create_elaboration_lines([(product, qty)])
+
+    def _create_elaboration_lines(self, products_qty):
+        """Create the sale order lines of several elaboration products at once,
+        adding the quantities to the lines of the order with the same product
+        :param products_qty: list of (product, qty) pairs
+        :return: the sale order lines created or updated
+        """
+        self.ensure_one()
         SaleOrderLine = self.env["sale.order.line"]
-        sol_for_product = self.order_line.filtered(lambda x: x.product_id == product)[
-            :1
-        ]
-        if sol_for_product:
-            sol_for_product.product_uom_qty += qty
-            return sol_for_product
-        sol = SaleOrderLine.new(
-            {"order_id": self.id, "product_id": product.id, "is_elaboration": True}
+        qty_by_product = defaultdict(float)
+        for product, qty in products_qty:
+            qty_by_product[product] += qty
+        sol_by_product = {}
+        for sol in self.order_line:
+            sol_by_product.setdefault(sol.product_id, sol)
+        sols = SaleOrderLine
+        new_products_qty = []
+        for product, qty in qty_by_product.items():
+            sol_for_product = sol_by_product.get(product)
+            if sol_for_product:
+                sol_for_product.product_uom_qty += qty
+                sols |= sol_for_product
+            else:
+                new_products_qty.append((product, qty))
+        if not new_products_qty:
+            return sols
+        new_sols = SaleOrderLine.concat(
+            *[
+                SaleOrderLine.new(
+                    {
+                        "order_id": self.id,
+                        "product_id": product.id,
+                        "is_elaboration": True,
+                    }
+                )
+                for product, _qty in new_products_qty
+            ]
         )
-        _execute_onchanges(sol, "product_id")
-        sol.update({"product_uom_qty": qty})
-        _execute_onchanges(sol, "product_uom_qty")
-        vals = sol._convert_to_write(sol._cache)
+        _execute_onchanges(new_sols, "product_id")
+        for sol, (_product, qty) in zip(new_sols, new_products_qty):
+            sol.update({"product_uom_qty": qty})
+        _execute_onchanges(new_sols, "product_uom_qty")
+        vals_list = [sol._convert_to_write(sol._cache) for sol in new_sols]
         if self.order_line:
-            vals["sequence"] = self.order_line[-1].sequence + 1
-        return SaleOrderLine.sudo().create(vals)
+            sequence = self.order_line[-1].sequence
+            for vals in vals_list:
+                sequence += 1
+                vals["sequence"] = sequence
+        return sols | SaleOrderLine.sudo().create(vals_list)
 
 
 class SaleOrderLine(models.Model):
@@ -94,8 +129,11 @@ class SaleOrderLine(models.Model):
             raise UserError(
                 _("Unsupported operator %s for searching on is_prepared") % (operator,)
             )
-        moves = self.env["stock.move"].search(
+        # The query is used as a subquery of the domain, so that the moves ids
+        # are not loaded in memory
+        moves_query = self.env["stock.move"]._search(
             [
+                ("sale_line_id", "!=", False),
                 (
                     "state",
                     "not in" if value else "in",
@@ -114,4 +152,4 @@ class SaleOrderLine(models.Model):
                 ),
             ]
         )
-        return [("move_ids", "in", moves.ids)]
+        return [("move_ids", "in", moves_query)]
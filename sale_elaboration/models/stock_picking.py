@@ -1,5 +1,7 @@
 # Copyright 2018 Tecnativa - Sergio Teruel
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
+from collections import defaultdict
+
 from odoo import models
 
 
@@ -8,11 +10,16 @@ class StockPicking(models.Model):
 
     def _action_done(self):
         res = super()._action_done()
+        products_qty_by_order = defaultdict(list)
         for pick in self.filtered(lambda x: x.picking_type_code == "outgoing"):
             elaboration_lines = pick.move_ids.filtered(
                 lambda x: x.sale_line_id.elaboration_ids
             )
             for line in elaboration_lines:
                 for product in line.sale_line_id.elaboration_ids.product_id:
-                    pick.sale_id._create_elaboration_line(product, line.quantity_done)
+                    products_qty_by_order[pick.sale_id].append(
+                        (product, line.quantity_done)
+                    )
+        for order, products_qty in products_qty_by_order.items():
+            order._create_elaboration_lines(products_qty)
         return res
@@ -99,6 +99,43 @@ class TestSaleElaboration(AccountTestInvoicingCommon):
         self.assertEqual(len(elaboration_lines), 1)
         self.assertEqual(elaboration_lines.price_unit, 50.0)
 
+    def test_search_is_prepared(self):
+        self.order.action_confirm()
+        product_line = self.order.order_line.filtered(
+            lambda line: line.product_id == self.product
+        )
+        domain = [("order_id", "=", self.order.id)]
+        sale_line_obj = self.env["sale.order.line"]
+        self.assertEqual(
+            sale_line_obj.search(domain + [("is_prepared", "=", False)]),
+            product_line,
+        )
+        self.assertFalse(sale_line_obj.search(domain + [("is_prepared", "=", True)]))
+        self.order.picking_ids.move_ids.quantity_done = 10.0
+        self.order.picking_ids._action_done()
+        self.assertEqual(
+            sale_line_obj.search(domain + [("is_prepared", "=", True)]),
+            product_line,
+        )
+
+    def test_create_elaboration_lines(self):
+        sols = self.order._create_elaboration_lines(
+            [
+                (self.product_elaboration_A, 2.0),
+                (self.product_elaboration_B, 1.0),
+                (self.product_elaboration_A, 3.0),
+            ]
+        )
+        self.assertEqual(len(sols), 2)
+        sol_a = sols.filtered(lambda x: x.product_id == self.product_elaboration_A)
+        self.assertEqual(sol_a.product_uom_qty, 5.0)
+        self.assertEqual(sol_a.price_unit, 50.0)
+        self.assertTrue(sol_a.is_elaboration)
+        # The quantities are added to the existing lines of the products
+        sols = self.order._create_elaboration_lines([(self.product_elaboration_A, 1)])
+        self.assertEqual(sols, sol_a)
+        self.assertEqual(sol_a.product_uom_qty, 6.0)
+
     def test_sale_elaboration_multi(self):
         self.order.order_line.create(
             {
@@ -2,7 +2,7 @@
 
 {
     "name": "Sale Order Lot Generator",
-    "version": "16.0.1.0.0",
+    "version": "16.0.1.1.0",
     "author": "Akretion, Odoo Community Association (OCA)",
     "website": "https://github.com/OCA/sale-workflow",
     "license": "AGPL-3",
@@ -10,5 +10,6 @@
     "depends": ["sale_order_lot_selection"],
     "maintainers": ["florian-dacosta", "mourad-ehm", "bealdav"],
     "data": ["views/product_template.xml"],
+    "post_init_hook": "_post_init_hook",
     "installable": True,
 }
@@ -1,36 +1,68 @@
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
-from odoo import models
+from odoo import api, fields, models
 
 
 class SaleOrder(models.Model):
     _inherit = "sale.order"
 
-    def _get_max_lot_index(self):
+    last_lot_index = fields.Integer(
+        copy=False,
+        readonly=True,
+        help="Index of the last lot generated for the lines of this order",
+    )
+
+    def _reserve_lot_indexes(self, count):
+        """Reserve count consecutive lot indexes and return the first one.
+
+        The counter is increased in the database, so that concurrent
+        transactions wait for each other instead of using the same indexes.
+        """
         self.ensure_one()
-        # when a new line is added to confirmed sale order
-        # get the max index_lot from the other lines
-        index_lot = 0
-        lot_ids = self.order_line.filtered(lambda l: l.lot_id).mapped("lot_id")
-        for lot in lot_ids:
-            lot_name = lot.name
-            index_str = lot_name.replace(self.name + "-", "")
-            last_index = int(index_str) if index_str.isdigit() else 0
-            index_lot = max(index_lot, last_index)
-        return index_lot
+        self.flush_recordset(["last_lot_index"])
+        self.env.cr.execute(
+            """
+            UPDATE sale_order
+            SET last_lot_index = COALESCE(last_lot_index, 0) + %s
+            WHERE id = %s
+            RETURNING last_lot_index
+            """,
+            (count, self.id),
+        )
+        last_index = self.env.cr.fetchone()[0]
+        self.invalidate_recordset(["last_lot_index"])
+        return last_index - count + 1
+
+    @api.model
+    def _init_last_lot_index(self):
+        """Set the lot counters from the names of the lots of the lines"""
+        self.env["sale.order.line"].flush_model(["order_id", "lot_id"])
+        self.env["stock.lot"].flush_model(["name"])
+        self.flush_model(["name", "last_lot_index"])
+        self.env.cr.execute(
+            """
+            UPDATE sale_order so
+            SET last_lot_index = lot_index.max_index
+            FROM (
+                SELECT so.id AS order_id,
+                    MAX(substr(lot.name, length(so.name) + 2)::integer) AS max_index
+                FROM sale_order so
+                JOIN sale_order_line sol ON sol.order_id = so.id
+                JOIN stock_lot lot ON lot.id = sol.lot_id
+                WHERE left(lot.name, length(so.name) + 1) = so.name || '-'
+                AND substr(lot.name, length(so.name) + 2) ~ '^[0-9]{1,9}$'
+                GROUP BY so.id
+            ) lot_index
+            WHERE so.id = lot_index.order_id
+            AND COALESCE(so.last_lot_index, 0) < lot_index.max_index
+            """
+        )
+        self.invalidate_model(["last_lot_index"])
 
     def generate_lot(self):
-        for rec in self:
-            index_lot = rec._get_max_lot_index() + 1
-            for line in rec.order_line:
-                if (
-                    line.product_id.auto_generate_prodlot
-                    and not line.lot_id
-                    and line.product_id.tracking != "none"
-                ):
-                    lot_id = line.create_lot(index_lot)
-                    index_lot += 1
-                    line.lot_id = lot_id
+        lines = self.order_line.filtered(lambda line: line._is_lot_to_generate())
+        for line, lot in lines._create_lots().items():
+            line.lot_id = lot
 
     def action_confirm(self):
         self.generate_lot()
@@ -1,6 +1,8 @@
 #   @author Valentin CHEMIERE <valentin.chemiere@akretion.com>
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl.html).
 
+from collections import defaultdict
+
 from odoo import api, models
 
 
@@ -18,24 +20,59 @@ class SaleOrderLine(models.Model):
             "company_id": self.order_id.company_id.id,
         }
 
-    def create_lot(self, index_lot=1):
+    def _is_lot_to_generate(self):
         self.ensure_one()
-        vals = self._prepare_vals_lot_number(index_lot)
-        return self.env["stock.lot"].create(vals)
+        return (
+            self.product_id.auto_generate_prodlot
+            and not self.lot_id
+            and self.product_id.tracking != "none"
+        )
+
+    def _create_lots(self):
+        """Create the lots of the lines with a single create, the indexes of
+        the lines of each order being reserved at once.
+
+        :return: dictionary {line: lot}
+        """
+        lines_by_order = defaultdict(list)
+        for line in self:
+            lines_by_order[line.order_id].append(line)
+        lines = []
+        vals_list = []
+        for order, order_lines in lines_by_order.items():
+            index_lot = order._reserve_lot_indexes(len(order_lines))
+            for line in order_lines:
+                lines.append(line)
+                vals_list.append(line._prepare_vals_lot_number(index_lot))
+                index_lot += 1
+        lots = self.env["stock.lot"].create(vals_list)
+        return dict(zip(lines, lots))
 
     @api.model_create_multi
     def create(self, values_list):
+        # we create the lots before creating the lines because the super method
+        # must create a procurement and move
+        new_lines = []
+        new_lines_values = []
         for values in values_list:
-            line = self.new(values)
-            # we create a lot before create a line because the super method
-            # must create a procurement and move
+            if values.get("lot_id"):
+                continue
+            order = self.env["sale.order"].browse(
+                values.get("order_id", self.env.context.get("default_order_id"))
+            )
+            product = self.env["product.product"].browse(values.get("product_id"))
+            # Only the lines that may need a lot are built in memory
             if (
-                line.order_id.state == "sale"
-                and line.product_id.auto_generate_prodlot
-                and not line.lot_id
-                and line.product_id.tracking != "none"
+                order.state != "sale"
+                or not product.auto_generate_prodlot
+                or product.tracking == "none"
             ):
-                index_lot = line.order_id._get_max_lot_index() + 1
-                lot_id = line.create_lot(index_lot)
-                values["lot_id"] = lot_id.id
+                continue
+            line = self.new(values)
+            if line._is_lot_to_generate():
+                new_lines.append(line)
+                new_lines_values.append(values)
+        lots = self.concat(*new_lines)._create_lots()
+        for line, values in zip(new_lines, new_lines_values):
+            values["lot_id"] = lots[line].id
         return super().create(values_list)
@@ -70,3 +70,35 @@ class TestSaleOrderLotGenerator(test_common.SingleTransactionCase):
                 self.assertEqual(line.lot_id, self.sol2.lot_id)
             if line.product_id.id == self.prd_acoustic.id:
                 self.assertEqual(line.lot_id, self.sol3.lot_id)
+
+    def test_sale_order_lot_generator_several_lines(self):
+        order = self.env["sale.order"].create(
+            {
+                "partner_id": self.env.ref("base.res_partner_18").id,
+                "order_line": [
+                    (0, 0, {"product_id": product.id, "product_uom_qty": 1})
+                    for product in (self.prd_flipover, self.prd_desk)
+                ],
+            }
+        )
+        order.action_confirm()
+        self.assertEqual(order.last_lot_index, 2)
+        self.assertEqual(
+            order.order_line.mapped("lot_id.name"),
+            ["%s-%03d" % (order.name, index) for index in (1, 2)],
+        )
+        lines = self.env["sale.order.line"].create(
+            [
+                {
+                    "order_id": order.id,
+                    "product_id": product.id,
+                    "product_uom_qty": 1,
+                }
+                for product in (self.prd_desk, self.prd_acoustic)
+            ]
+        )
+        self.assertEqual(order.last_lot_index, 4)
+        self.assertEqual(
+            lines.mapped("lot_id.name"),
+            ["%s-%03d" % (order.name, index) for index in (3, 4)],
+        )
@@ -1,5 +1,7 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 from . import ir_config_parameter
+from . import product
 from . import sale_order
 from . import sale_order_picker
+from . import stock
@@ -0,0 +1,43 @@
+# Copyright 2026 Dixmit
+# License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
+from odoo import api, models
+
+
+class ProductTemplate(models.Model):
+    _inherit = "product.template"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env["sale.order"]._clear_picker_product_cache()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env["sale.order"]._clear_picker_product_cache_on_write(vals)
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["sale.order"]._clear_picker_product_cache()
+        return res
+
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        self.env["sale.order"]._clear_picker_product_cache()
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env["sale.order"]._clear_picker_product_cache_on_write(vals)
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["sale.order"]._clear_picker_product_cache()
+        return res
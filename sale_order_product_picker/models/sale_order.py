@@ -1,12 +1,25 @@
 # Copyright 2023 Tecnativa - Sergio Teruel
 # Copyright 2023 Tecnativa - Carlos Dauden
 # License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
+import time
 from ast import literal_eval
+from collections import defaultdict
 from datetime import timedelta
 
 from odoo import api, fields, models
 from odoo.osv import expression
 from odoo.tools import float_compare, ormcache
+from odoo.tools.lru import LRU
+
+PICKER_PRODUCT_CACHE_SIZE = 512
+
+# Product ids found by the picker searches, by database. The searches
+# filtering by available quantity are kept apart, as they are invalidated
+# by the stock changes too.
+_picker_product_cache = defaultdict(lambda: LRU(PICKER_PRODUCT_CACHE_SIZE))
+_picker_available_product_cache = defaultdict(
+    lambda: LRU(PICKER_PRODUCT_CACHE_SIZE)
+)
 
 
 class SaleOrder(models.Model):
@@ -18,6 +31,9 @@ class SaleOrder(models.Model):
         compute="_compute_picker_ids",
         compute_sudo=True,
     )
+    # Number of pages of products loaded in the picker
+    picker_page = fields.Integer(store=False)
+    picker_has_more = fields.Boolean(compute="_compute_picker_ids", compute_sudo=True)
     # Not stored fields, they are only used to filter picker products
     picker_filter = fields.Selection(
         selection="_list_product_picker_filters", string="Filter", store=False
@@ -47,14 +63,17 @@ class SaleOrder(models.Model):
     product_name_search = fields.Char(string="Search product", store=False)
 
     @api.model
-    def _list_product_picker_filters(self):
+    def _get_product_picker_filters(self):
         action = self.env.ref(
             "sale_order_product_picker.product_normal_action_sell_picker"
         )
-        product_filters = self.env["ir.filters"].search(
+        return self.env["ir.filters"].search(
             [("model_id", "=", "product.product"), ("action_id", "=", action.id)]
         )
-        return [(f.id, f.name) for f in product_filters]
+
+    @api.model
+    def _list_product_picker_filters(self):
+        return [(f.id, f.name) for f in self._get_product_picker_filters()]
 
     @ormcache()
     def _get_partner_picker_field(self):
@@ -86,6 +105,125 @@ class SaleOrder(models.Model):
             .get_param("sale_order_product_picker.product_picker_limit", "40")
         )
 
+    def _get_product_picker_page_size(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("sale_order_product_picker.product_picker_page_size", "40")
+        )
+
+    def _get_product_picker_page_limit(self):
+        """Number of products of the loaded pages"""
+        return min(
+            self._get_product_picker_limit(),
+            max(self.picker_page, 1) * self._get_product_picker_page_size(),
+        )
+
+    @api.model
+    def _get_view(self, view_id=None, view_type="form", **options):
+        arch, view = super()._get_view(view_id, view_type, **options)
+        if view_type == "form":
+            # Display all the loaded pages of the picker without client pager
+            for node in arch.xpath("//field[@name='picker_ids']"):
+                node.set("limit", str(self._get_product_picker_limit()))
+        return arch, view
+
+    def _get_product_picker_page_offset(self):
+        """Number of products of the pages loaded before the last one"""
+        return min(
+            self._get_product_picker_limit(),
+            (max(self.picker_page, 1) - 1) * self._get_product_picker_page_size(),
+        )
+
+    @api.onchange(
+        "partner_id",
+        "partner_shipping_id",
+        "warehouse_id",
+        "picker_order",
+        "picker_origin_data",
+        "picker_filter",
+        "picker_only_available",
+        "picker_product_attribute_value_id",
+        "product_name_search",
+    )
+    def _onchange_picker_search(self):
+        # A new search starts on the first page
+        self.picker_page = 1
+
+    @api.onchange("picker_page")
+    def _onchange_picker_page(self):
+        """Append the products of the page being loaded to the picker, the
+        products of the previous pages are kept as they are"""
+        if self.picker_page <= 1 or self._get_picker_product_ids() is None:
+            return
+        offset = self._get_product_picker_page_offset()
+        picker_data_list = self._get_product_picker_data(offset)
+        self.picker_ids += self._new_product_pickers(picker_data_list)
+        self._set_picker_has_more(offset + len(picker_data_list))
+
+    def _get_product_picker_cache_ttl(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("sale_order_product_picker.product_cache_ttl", "60")
+        )
+
+    @api.model
+    def _clear_picker_product_cache(self, only_available=False):
+        """Drop the cached picker searches of the current database.
+        Entries are also expired after the configured time to see the
+        changes made by other workers.
+        """
+        dbname = self.env.cr.dbname
+        _picker_available_product_cache[dbname].clear()
+        if not only_available:
+            _picker_product_cache[dbname].clear()
+
+    @api.model
+    def _get_picker_product_cache_fields(self):
+        """Product fields whose changes invalidate the cached picker searches:
+        the ones used by the searches, their order and the picker filters"""
+        fields = {
+            "active",
+            "sale_ok",
+            "company_id",
+            "name",
+            "default_code",
+            "barcode",
+            "priority",
+            "product_tmpl_id",
+            "attribute_line_ids",
+            "product_template_attribute_value_ids",
+        }
+        fields.update(name for name, __ in self._fields["picker_order"].selection)
+        for product_filter in self.sudo()._get_product_picker_filters():
+            for leaf in literal_eval(product_filter.domain or "[]"):
+                if isinstance(leaf, (list, tuple)):
+                    fields.add(leaf[0].split(".")[0])
+        return fields
+
+    @api.model
+    def _clear_picker_product_cache_on_write(self, vals):
+        """Drop the cached picker searches when a product write changes one of
+        the fields they depend on"""
+        if set(vals) & self._get_picker_product_cache_fields():
+            self._clear_picker_product_cache()
+
+    def _get_picker_product_cache_key(self):
+        return (
+            self.env.uid,
+            self.company_id.id,
+            tuple(self.env.companies.ids),
+            self.env.lang,
+            self.picker_filter,
+            self.picker_product_attribute_value_id.id,
+            self.picker_only_available,
+            self.warehouse_id.id,
+            self.env.context.get("to_date"),
+            self.picker_order,
+            self.product_name_search,
+        )
+
     def _get_picker_product_domain(self):
         product_filter = self.env["ir.filters"].browse(self.picker_filter)
         # TODO: Improve to apply field view domain (Assortments)
@@ -121,8 +259,6 @@ class SaleOrder(models.Model):
             )
         return domain
 
-    # TODO: Invalidate cache on product write if next line is uncommented
-    # @ormcache("self.partner_id", "self.picker_filter", "self.product_name_search")
     def _get_picker_product_ids(self):
         # [2:] to avoid partner and picker_order fields
         if not self.partner_id or not any(
@@ -139,6 +275,23 @@ class SaleOrder(models.Model):
             )
             or None,
         )
+        ttl = self._get_product_picker_cache_ttl()
+        if ttl:
+            cache = (
+                _picker_available_product_cache
+                if self.picker_only_available
+                else _picker_product_cache
+            )[self.env.cr.dbname]
+            key = self._get_picker_product_cache_key()
+            cached = cache.get(key)
+            if cached and time.monotonic() - cached[0] < ttl:
+                return list(cached[1])
+            product_ids = list(self._search_picker_product_ids())
+            cache[key] = (time.monotonic(), tuple(product_ids))
+            return product_ids
+        return self._search_picker_product_ids()
+
+    def _search_picker_product_ids(self):
         Product = self.env["product.product"]
         domain = self._get_picker_product_domain()
         order = self.picker_order or None
@@ -153,35 +306,78 @@ class SaleOrder(models.Model):
             product_ids = Product.search(domain, order=order).ids
         return product_ids
 
-    # TODO: Use field list instead overwrite method
-    def filter_picker_so_lines(self, picker_data):
-        return self.order_line.filtered(
-            lambda sol: sol.product_id.id == picker_data["product_id"][0]
+    def _get_picker_so_lines_keys(self):
+        """Fields of the order lines matching the picker data of a picker line.
+        Many2one values of the picker data are (id, name) pairs.
+        """
+        return ["product_id"]
+
+    @api.model
+    def _get_picker_key_value(self, value):
+        if isinstance(value, models.BaseModel):
+            return value.id
+        if isinstance(value, (list, tuple)):
+            return value[0] if value else False
+        return value
+
+    def _get_picker_so_lines_index(self):
+        """Group the order lines by the values of the picker keys"""
+        keys = self._get_picker_so_lines_keys()
+        index = defaultdict(lambda: self.env["sale.order.line"])
+        for line in self.order_line:
+            index[tuple(self._get_picker_key_value(line[key]) for key in keys)] |= line
+        return index
+
+    def filter_picker_so_lines(self, picker_data, so_lines_index=None):
+        if so_lines_index is None:
+            so_lines_index = self._get_picker_so_lines_index()
+        return so_lines_index.get(
+            tuple(
+                self._get_picker_key_value(picker_data.get(key))
+                for key in self._get_picker_so_lines_keys()
+            ),
+            self.env["sale.order.line"],
+        )
+
+    def _get_product_picker_data(self, offset=0):
+        """Data of the products of the loaded pages, from ``offset``"""
+        return getattr(
+            # Force no display archived records due we are in a computed method.
+            # See: https://github.com/odoo/odoo/blob/
+            # b1f9b7167979aa3a1910fd2ab09507eb26bd1f79/odoo/models.py#L6028
+            self.with_context(active_test=True),
+            "_get_product_picker_data_{}".format(self.picker_origin_data or "products"),
+        )(offset)
+
+    def _new_product_pickers(self, picker_data_list):
+        picker_ids = self.env["sale.order.picker"].browse()
+        so_lines_index = self._get_picker_so_lines_index()
+        for picker_data in picker_data_list:
+            so_lines = self.filter_picker_so_lines(picker_data, so_lines_index)
+            picker_ids += self.picker_ids.new(
+                self._prepare_product_picker_vals(picker_data, so_lines)
+            )
+        return picker_ids
+
+    def _set_picker_has_more(self, loaded_count):
+        # A full set of pages is assumed to be followed by more products
+        page_limit = self._get_product_picker_page_limit()
+        self.picker_has_more = (
+            loaded_count >= page_limit
+            and page_limit < self._get_product_picker_limit()
         )
 
     @api.depends(lambda s: s._get_picker_trigger_search_fields())
     def _compute_picker_ids(self):
         for order in self:
+            order.picker_has_more = False
             product_ids = order._get_picker_product_ids()
             if product_ids is None:
                 order.picker_ids = False
                 continue
-            picker_data_list = getattr(
-                # Force no display archived records due we are in a computed method.
-                # See: https://github.com/odoo/odoo/blob/
-                # b1f9b7167979aa3a1910fd2ab09507eb26bd1f79/odoo/models.py#L6028
-                order.with_context(active_test=True),
-                "_get_product_picker_data_{}".format(
-                    order.picker_origin_data or "products"
-                ),
-            )()
-            picker_ids = self.env["sale.order.picker"].browse()
-            for picker_data in picker_data_list:
-                so_lines = order.filter_picker_so_lines(picker_data)
-                picker_ids += order.picker_ids.new(
-                    order._prepare_product_picker_vals(picker_data, so_lines)
-                )
-            order.picker_ids = picker_ids
+            picker_data_list = order._get_product_picker_data()
+            order.picker_ids = order._new_product_pickers(picker_data_list)
+            order._set_picker_has_more(len(picker_data_list))
 
     def _product_picker_data_sale_order_domain(self):
         """Domain to find recent SO lines."""
@@ -230,15 +426,15 @@ class SaleOrder(models.Model):
         }
         return vals
 
-    def _get_product_picker_data_products(self):
-        limit = self._get_product_picker_limit()
+    def _get_product_picker_data_products(self, offset=0):
+        limit = self._get_product_picker_page_limit()
         products = self.env["product.product"].browse(
-            self._get_picker_product_ids()[:limit]
+            self._get_picker_product_ids()[offset:limit]
         )
         return [{"product_id": (p.id, p.name)} for p in products]
 
-    def _get_product_picker_data_sale_order(self):
-        limit = self._get_product_picker_limit()
+    def _get_product_picker_data_sale_order(self, offset=0):
+        limit = self._get_product_picker_page_limit()
         if self.picker_order == "categ_id":
             found_lines = self.env["sale.order.line"].read_group(
                 self._product_picker_data_sale_order_domain(),
@@ -263,7 +459,7 @@ class SaleOrder(models.Model):
                 ),
                 reverse=True,
             )
-        return found_lines[:limit]
+        return found_lines[offset:limit]
 
 
 class SaleOrderLine(models.Model):
@@ -1,10 +1,19 @@
 # Copyright 2023 Tecnativa - Sergio Teruel
 # Copyright 2023 Tecnativa - Carlos Dauden
 # License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
+import time as time_module
+from collections import defaultdict
 from datetime import datetime, time
 
 from odoo import api, fields, models
 from odoo.tools import float_compare, ormcache
+from odoo.tools.lru import LRU
+
+PICKER_STOCK_CACHE_SIZE = 256
+
+# Available quantities of the products, by database and by warehouse, date
+# and quantity field
+_picker_stock_cache = defaultdict(lambda: LRU(PICKER_STOCK_CACHE_SIZE))
 
 
 class SaleOrderPicker(models.Model):
@@ -60,16 +69,26 @@ class SaleOrderPicker(models.Model):
 
     @api.depends("product_id", "uom_id", "product_uom_qty")
     def _compute_pricelist_item_id(self):
+        # The rules are evaluated at once for the products sharing pricelist,
+        # quantity, unit of measure and date
+        lines_by_key = defaultdict(lambda: self.browse())
         for line in self:
-            if not line.order_id.pricelist_id:
+            if not line.order_id.pricelist_id or not line.product_id:
                 line.pricelist_item_id = False
-            else:
-                line.pricelist_item_id = line.order_id.pricelist_id._get_product_rule(
-                    line.product_id,
-                    line.product_uom_qty or 1.0,
-                    uom=line.uom_id,
-                    date=line.order_id.date_order,
-                )
+                continue
+            key = (
+                line.order_id.pricelist_id,
+                line.product_uom_qty or 1.0,
+                line.uom_id,
+                line.order_id.date_order,
+            )
+            lines_by_key[key] |= line
+        for (pricelist, qty, uom, date), lines in lines_by_key.items():
+            rules = pricelist._compute_price_rule(
+                lines.product_id, qty, uom=uom, date=date, compute_price=False
+            )
+            for line in lines:
+                line.pricelist_item_id = rules[line.product_id.id][1]
 
     @api.depends("product_id")
     def _compute_no_variant_attribute_values(self):
@@ -243,14 +262,73 @@ class SaleOrderPicker(models.Model):
 
     def _compute_qty_available(self):
         available_field = self._get_qty_available_field()
-        self = self.with_context(
-            warehouse=self.warehouse_id.id,
-            to_date=available_field == "virtual_available"
-            and self._get_virtual_available_to_date(self.order_id.commitment_date)
-            or None,
-        )
+        lines_by_key = defaultdict(lambda: self.browse())
         for line in self:
-            line.qty_available = line.product_id[available_field]
+            to_date = (
+                available_field == "virtual_available"
+                and self._get_virtual_available_to_date(line.order_id.commitment_date)
+                or None
+            )
+            lines_by_key[(line.warehouse_id, to_date)] |= line
+        for (warehouse, to_date), lines in lines_by_key.items():
+            quantities = self._get_available_quantities(
+                lines.product_id, warehouse, to_date, available_field
+            )
+            for line in lines:
+                line.qty_available = quantities.get(line.product_id.id, 0.0)
+
+    @api.model
+    def _get_stock_cache_ttl(self):
+        return int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("sale_order_product_picker.stock_cache_ttl", "30")
+        )
+
+    @api.model
+    def _clear_picker_stock_cache(self):
+        _picker_stock_cache[self.env.cr.dbname].clear()
+
+    @api.model
+    def _get_available_quantities(self, products, warehouse, to_date, available_field):
+        """Return the available quantities of the products in the warehouse as a
+        dictionary {product id: quantity}.
+        The stock quantities of all the products are computed at once and kept a
+        few seconds for the next pickers of the same user, companies, warehouse
+        and date.
+        """
+        ttl = self._get_stock_cache_ttl()
+        cache = _picker_stock_cache[self.env.cr.dbname]
+        key = (
+            self.env.uid,
+            tuple(self.env.companies.ids),
+            warehouse.id,
+            to_date,
+            available_field,
+        )
+        cached = cache.get(key)
+        if not cached or time_module.monotonic() - cached[0] >= ttl:
+            cached = (time_module.monotonic(), {})
+            if ttl:
+                cache[key] = cached
+        quantities = cached[1]
+        missing = products.filtered(lambda product: product.id not in quantities)
+        if not missing:
+            return quantities
+        missing = missing.with_context(warehouse=warehouse.id, to_date=to_date)
+        if available_field in ("qty_available", "virtual_available", "free_qty"):
+            quantities_dict = missing._compute_quantities_dict(
+                None, None, None, to_date=to_date
+            )
+            quantities.update(
+                (product_id, values[available_field])
+                for product_id, values in quantities_dict.items()
+            )
+        else:
+            quantities.update(
+                (product.id, product[available_field]) for product in missing
+            )
+        return quantities
 
     def _get_last_sale_price_product(self, use_delivery_address=False):
         """
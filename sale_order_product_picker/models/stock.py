@@ -0,0 +1,56 @@
+# Copyright 2026 Dixmit
+# License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
+from odoo import api, models
+
+# Fields of the moves the available and forecasted quantities depend on
+PICKER_STOCK_MOVE_FIELDS = {
+    "state",
+    "product_id",
+    "product_uom_qty",
+    "product_qty",
+    "product_uom",
+    "quantity_done",
+    "location_id",
+    "location_dest_id",
+    "date",
+    "company_id",
+}
+
+
+def _clear_picker_stock_caches(env):
+    env["sale.order"]._clear_picker_product_cache(only_available=True)
+    env["sale.order.picker"]._clear_picker_stock_cache()
+
+
+class StockQuant(models.Model):
+    _inherit = "stock.quant"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        _clear_picker_stock_caches(self.env)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        _clear_picker_stock_caches(self.env)
+        return super().write(vals)
+
+    def unlink(self):
+        _clear_picker_stock_caches(self.env)
+        return super().unlink()
+
+
+class StockMove(models.Model):
+    _inherit = "stock.move"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super().create(vals_list)
+        # Forecasted quantities depend on the moves
+        _clear_picker_stock_caches(self.env)
+        return res
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & PICKER_STOCK_MOVE_FIELDS:
+            _clear_picker_stock_caches(self.env)
+        return res
@@ -0,0 +1,53 @@
+/** @odoo-module **/
+/* Copyright 2026 Dixmit
+ * License LGPL-3.0 or later (https://www.gnu.org/licenses/lgpl.html).
+ */
+import {onMounted, onWillUnmount} from "@odoo/owl";
+import {KanbanRenderer} from "@web/views/kanban/kanban_renderer";
+import {patch} from "@web/core/utils/patch";
+
+patch(KanbanRenderer.prototype, "sale_order_product_picker.KanbanRenderer", {
+    /**
+     * Load the next page of picker products when the bottom of the picker is
+     * reached while scrolling.
+     *
+     * @override
+     */
+    setup() {
+        this._super(...arguments);
+        if (!(this.props.archInfo.className || "").includes("o_picker_kanban")) {
+            return;
+        }
+        this.pickerPageLoading = false;
+        const onScroll = () => this._onPickerScroll();
+        let scrollable = null;
+        onMounted(() => {
+            scrollable = this.rootRef.el.closest(".o_content") || window;
+            scrollable.addEventListener("scroll", onScroll);
+        });
+        onWillUnmount(() => {
+            if (scrollable) {
+                scrollable.removeEventListener("scroll", onScroll);
+            }
+        });
+    },
+    /**
+     * @private
+     */
+    async _onPickerScroll() {
+        const root = this.props.list.model.root;
+        if (this.pickerPageLoading || !root.data.picker_has_more) {
+            return;
+        }
+        const rect = this.rootRef.el.getBoundingClientRect();
+        if (rect.bottom > window.innerHeight + 200) {
+            return;
+        }
+        this.pickerPageLoading = true;
+        try {
+            await root.update({picker_page: (root.data.picker_page || 1) + 1});
+        } finally {
+            this.pickerPageLoading = false;
+        }
+    },
+});
@@ -0,0 +1,244 @@
+# Copyright 2026 Dixmit
+# License AGPL-3 - See https://www.gnu.org/licenses/agpl-3.0.html
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, new_test_user
+
+from odoo.addons.base.tests.common import DISABLED_MAIL_CONTEXT
+
+from odoo.addons.sale_order_product_picker.models.sale_order import (
+    _picker_available_product_cache,
+    _picker_product_cache,
+)
+from odoo.addons.sale_order_product_picker.models.sale_order_picker import (
+    _picker_stock_cache,
+)
+
+
+class TestSaleOrderProductPicker(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_salesman = new_test_user(
+            cls.env,
+            "test_picker_salesman",
+            "sales_team.group_sale_salesman,stock.group_stock_user",
+            DISABLED_MAIL_CONTEXT,
+        )
+        cls.partner = cls.env["res.partner"].create({"name": "Picker Customer"})
+        cls.warehouse = cls.env.ref("stock.warehouse0")
+        cls.product_1, cls.product_2, cls.product_3 = cls.env[
+            "product.product"
+        ].create(
+            [
+                {"name": "Picker Test %s" % i, "detailed_type": "product"}
+                for i in range(1, 4)
+            ]
+        )
+        cls.products = cls.product_1 | cls.product_2 | cls.product_3
+
+    def setUp(self):
+        super().setUp()
+        # The caches are kept between transactions
+        self.env["sale.order"]._clear_picker_product_cache()
+        self.env["sale.order.picker"]._clear_picker_stock_cache()
+        self.addCleanup(self.env["sale.order"]._clear_picker_product_cache)
+        self.addCleanup(self.env["sale.order.picker"]._clear_picker_stock_cache)
+
+    def _new_order(self, **vals):
+        return self.env["sale.order"].new(
+            dict(
+                {
+                    "partner_id": self.partner.id,
+                    "warehouse_id": self.warehouse.id,
+                    "product_name_search": "Picker Test",
+                },
+                **vals,
+            )
+        )
+
+    def _set_quantity(self, product, quantity, location=None):
+        self.env["stock.quant"]._update_available_quantity(
+            product, location or self.warehouse.lot_stock_id, quantity
+        )
+
+    def _create_incoming_move(self, product, quantity, date):
+        move = self.env["stock.move"].create(
+            {
+                "name": product.name,
+                "product_id": product.id,
+                "product_uom_qty": quantity,
+                "product_uom": product.uom_id.id,
+                "location_id": self.env.ref("stock.stock_location_suppliers").id,
+                "location_dest_id": self.warehouse.lot_stock_id.id,
+                "date": date,
+            }
+        )
+        move._action_confirm()
+        return move
+
+    def _check_available_quantities(
+        self, products, warehouse, to_date, field, picker_model=None
+    ):
+        """Check the quantities of the picker match the ones of the products"""
+        if picker_model is None:
+            picker_model = self.env["sale.order.picker"]
+        products = products.with_env(picker_model.env)
+        quantities = picker_model._get_available_quantities(
+            products, warehouse, to_date, field
+        )
+        products = products.with_context(warehouse=warehouse.id, to_date=to_date)
+        for product in products:
+            self.assertEqual(quantities[product.id], product[field])
+        return quantities
+
+    def test_picker_product_cache(self):
+        order = self._new_order()
+        self.assertEqual(set(order._get_picker_product_ids()), set(self.products.ids))
+        cache = _picker_product_cache[self.env.cr.dbname]
+        self.assertIn(order._get_picker_product_cache_key(), cache)
+        # The product changes are seen by the next search
+        self.product_1.name = "Renamed product"
+        self.product_2.active = False
+        self.assertEqual(order._get_picker_product_ids(), self.product_3.ids)
+        # And so are the stock changes in the searches of available products
+        order.picker_only_available = True
+        self.assertFalse(order._get_picker_product_ids())
+        self.assertTrue(_picker_available_product_cache[self.env.cr.dbname])
+        self._set_quantity(self.product_3, 5.0)
+        self.assertEqual(order._get_picker_product_ids(), self.product_3.ids)
+
+    def test_picker_product_cache_key(self):
+        company_2 = self.env["res.company"].create({"name": "Picker Company 2"})
+        self.env.user.company_ids |= company_2
+        order = self._new_order()
+        order._get_picker_product_ids()
+        order.with_user(self.user_salesman)._get_picker_product_ids()
+        order.with_context(
+            allowed_company_ids=[self.env.company.id, company_2.id]
+        )._get_picker_product_ids()
+        # An entry for each user and set of companies
+        cache = _picker_product_cache[self.env.cr.dbname]
+        keys = {
+            order._get_picker_product_cache_key(),
+            order.with_user(self.user_salesman)._get_picker_product_cache_key(),
+            order.with_context(
+                allowed_company_ids=[self.env.company.id, company_2.id]
+            )._get_picker_product_cache_key(),
+        }
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(len(cache), 3)
+        for key in keys:
+            self.assertIn(key, cache)
+
+    def test_available_quantities(self):
+        self._set_quantity(self.product_1, 5.0)
+        self._create_incoming_move(self.product_2, 3.0, fields.Datetime.now())
+        for field, to_date in (
+            ("qty_available", None),
+            ("virtual_available", fields.Date.today()),
+            ("free_qty", None),
+        ):
+            self._check_available_quantities(
+                self.products, self.warehouse, to_date, field
+            )
+        # The cached quantities are dropped on the stock changes
+        self._set_quantity(self.product_3, 2.0)
+        quantities = self._check_available_quantities(
+            self.products, self.warehouse, None, "qty_available"
+        )
+        self.assertEqual(quantities[self.product_3.id], 2.0)
+
+    def test_available_quantities_cache_key(self):
+        cache = _picker_stock_cache[self.env.cr.dbname]
+        # By warehouse
+        warehouse_2 = self.env["stock.warehouse"].create(
+            {"name": "Picker Warehouse 2", "code": "PWH2"}
+        )
+        self._set_quantity(self.product_1, 5.0)
+        self._set_quantity(self.product_1, 2.0, warehouse_2.lot_stock_id)
+        quantities = self._check_available_quantities(
+            self.product_1, self.warehouse, None, "qty_available"
+        )
+        quantities_2 = self._check_available_quantities(
+            self.product_1, warehouse_2, None, "qty_available"
+        )
+        self.assertEqual(quantities[self.product_1.id], 5.0)
+        self.assertEqual(quantities_2[self.product_1.id], 2.0)
+        # By date
+        today = fields.Date.today()
+        self._create_incoming_move(
+            self.product_2, 3.0, fields.Datetime.now() + timedelta(days=10)
+        )
+        quantities = self._check_available_quantities(
+            self.product_2, self.warehouse, today, "virtual_available"
+        )
+        quantities_2 = self._check_available_quantities(
+            self.product_2,
+            self.warehouse,
+            today + timedelta(days=20),
+            "virtual_available",
+        )
+        self.assertEqual(quantities[self.product_2.id], 0.0)
+        self.assertEqual(quantities_2[self.product_2.id], 3.0)
+        self.assertEqual(len(cache), 2)
+        # By user and companies
+        company_2 = self.env["res.company"].create({"name": "Picker Company 2"})
+        self.env.user.company_ids |= company_2
+        self._set_quantity(
+            self.product_1,
+            4.0,
+            self.env["stock.warehouse"]
+            .search([("company_id", "=", company_2.id)], limit=1)
+            .lot_stock_id,
+        )
+        no_warehouse = self.env["stock.warehouse"]
+        quantities = self._check_available_quantities(
+            self.product_1, no_warehouse, None, "qty_available"
+        )
+        quantities_2 = self._check_available_quantities(
+            self.product_1,
+            no_warehouse,
+            None,
+            "qty_available",
+            self.env["sale.order.picker"].with_context(
+                allowed_company_ids=[self.env.company.id, company_2.id]
+            ),
+        )
+        self.assertEqual(
+            quantities_2[self.product_1.id], quantities[self.product_1.id] + 4.0
+        )
+        self._check_available_quantities(
+            self.product_1,
+            no_warehouse,
+            None,
+            "qty_available",
+            self.env["sale.order.picker"].with_user(self.user_salesman),
+        )
+        self.assertEqual(len(cache), 3)
+
+    def test_picker_pages(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "sale_order_product_picker.product_picker_page_size", "2"
+        )
+        self.env["product.product"].create(
+            [{"name": "Picker Test %s" % i} for i in (4, 5)]
+        )
+        order = self._new_order()
+        product_ids = order._get_picker_product_ids()
+        self.assertEqual(len(product_ids), 5)
+        pickers = order.picker_ids
+        self.assertEqual(pickers.product_id.ids, product_ids[:2])
+        self.assertTrue(order.picker_has_more)
+        # The next page is appended to the loaded pickers
+        order.picker_page = 2
+        order._onchange_picker_page()
+        self.assertEqual(order.picker_ids[:2], pickers)
+        self.assertEqual(order.picker_ids.product_id.ids, product_ids[:4])
+        self.assertTrue(order.picker_has_more)
+        # Until the last page
+        order.picker_page = 3
+        order._onchange_picker_page()
+        self.assertEqual(order.picker_ids.product_id.ids, product_ids)
+        self.assertFalse(order.picker_has_more)
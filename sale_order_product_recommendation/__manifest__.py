@@ -4,7 +4,7 @@
 {
     "name": "Sale Order Product Recommendation",
     "summary": "Recommend products to sell to customer based on history",
-    "version": "16.0.3.0.1",
+    "version": "16.0.3.1.0",
     "category": "Sales",
     "website": "https://github.com/OCA/sale-workflow",
     "author": "Tecnativa, Odoo Community Association (OCA)",
@@ -21,4 +21,5 @@
         "views/res_config_settings_views.xml",
         "views/sale_order_view.xml",
     ],
+    "post_init_hook": "_post_init_hook",
 }
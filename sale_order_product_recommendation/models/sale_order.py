@@ -0,0 +1,18 @@
+# Copyright 2026 Dixmit
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from odoo import models
+
+
+class SaleOrder(models.Model):
+    _inherit = "sale.order"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {
+            "company_id",
+            "date_order",
+            "partner_id",
+            "partner_shipping_id",
+        } & vals.keys():
+            self.order_line._update_recommendation_history()
+        return res
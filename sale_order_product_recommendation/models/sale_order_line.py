@@ -0,0 +1,63 @@
+# Copyright 2026 Dixmit
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+from collections import defaultdict
+
+from odoo import api, fields, models
+
+
+class SaleOrderLine(models.Model):
+    _inherit = "sale.order.line"
+
+    recommendation_history_id = fields.Many2one(
+        "sale.order.recommendation.history",
+        index="btree_not_null",
+        readonly=True,
+        copy=False,
+    )
+
+    def _get_recommendation_history_key(self):
+        """Key of the recommendation history counting this line, False when
+        the line must not be recommended."""
+        self.ensure_one()
+        order = self.order_id
+        if (
+            not self.product_id
+            or self.display_type
+            or not order.date_order
+            or not order.partner_shipping_id
+            or ("is_delivery" in self._fields and self.is_delivery)
+        ):
+            return False
+        return (
+            order.company_id.id,
+            order.partner_id.commercial_partner_id.id,
+            order.partner_shipping_id.id,
+            self.product_id.id,
+            order.date_order.date().replace(day=1),
+        )
+
+    def _update_recommendation_history(self):
+        lines = self.sudo()
+        keys = {line: line._get_recommendation_history_key() for line in lines}
+        history_ids = self.env["sale.order.recommendation.history"]._get_history_ids(
+            {key for key in keys.values() if key}
+        )
+        lines_by_history = defaultdict(list)
+        for line, key in keys.items():
+            history_id = history_ids.get(key, False)
+            if line.recommendation_history_id.id != history_id:
+                lines_by_history[history_id].append(line.id)
+        for history_id, line_ids in lines_by_history.items():
+            lines.browse(line_ids).write({"recommendation_history_id": history_id})
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines._update_recommendation_history()
+        return lines
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"product_id", "order_id", "display_type"} & vals.keys():
+            self._update_recommendation_history()
+        return res
@@ -0,0 +1,206 @@
+# Copyright 2026 Dixmit
+# License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
+
+from odoo import api, fields, models
+
+
+class SaleOrderRecommendationHistory(models.Model):
+    """Delivered quantities of a product to a customer in a month.
+
+    Aggregate of the sales order lines, kept up to date when the lines
+    change, from which the recommendations are read instead of scanning
+    all the sales order lines of the customer.
+    """
+
+    _name = "sale.order.recommendation.history"
+    _description = "Sale recommendation history"
+    _order = "month desc, id desc"
+
+    company_id = fields.Many2one("res.company", required=True, readonly=True)
+    commercial_partner_id = fields.Many2one(
+        "res.partner", required=True, readonly=True, ondelete="cascade"
+    )
+    partner_shipping_id = fields.Many2one(
+        "res.partner", required=True, readonly=True, ondelete="cascade"
+    )
+    product_id = fields.Many2one(
+        "product.product", required=True, readonly=True, ondelete="cascade"
+    )
+    month = fields.Date(required=True, readonly=True)
+    line_ids = fields.One2many(
+        "sale.order.line", "recommendation_history_id", readonly=True
+    )
+    times_delivered = fields.Integer(compute="_compute_delivered", store=True)
+    units_delivered = fields.Float(
+        compute="_compute_delivered",
+        store=True,
+        digits="Product Unit of Measure",
+    )
+
+    _sql_constraints = [
+        (
+            "key_uniq",
+            "UNIQUE(company_id, commercial_partner_id, partner_shipping_id, "
+            "product_id, month)",
+            "There is already a history for this customer, product and month.",
+        ),
+    ]
+
+    def init(self):
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS sale_order_recommendation_history_partner_idx
+            ON sale_order_recommendation_history
+            (company_id, commercial_partner_id, month)
+            """
+        )
+        self.env.cr.execute(
+            """
+            CREATE INDEX IF NOT EXISTS sale_order_recommendation_history_shipping_idx
+            ON sale_order_recommendation_history
+            (company_id, partner_shipping_id, month)
+            """
+        )
+
+    @api.depends("line_ids.qty_delivered")
+    def _compute_delivered(self):
+        for history in self:
+            # Lines of every salesperson are counted
+            lines = history.sudo().line_ids.filtered("qty_delivered")
+            history.times_delivered = len(lines)
+            history.units_delivered = sum(lines.mapped("qty_delivered"))
+
+    @api.model
+    def _get_history_ids(self, keys):
+        """Return a dictionary {key: history id} for the given keys, the
+        histories being created when missing.
+
+        A key is a tuple (company id, commercial partner id, shipping partner
+        id, product id, month).
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        company_ids, partner_ids, shipping_ids, product_ids, months = zip(*keys)
+        params = {
+            "uid": self.env.uid,
+            "company_ids": list(company_ids),
+            "partner_ids": list(partner_ids),
+            "shipping_ids": list(shipping_ids),
+            "product_ids": list(product_ids),
+            "months": list(months),
+        }
+        self.flush_model()
+        # Plain SQL to not fail on the histories created in the meantime
+        # by a concurrent transaction.
+        self.env.cr.execute(
+            """
+            INSERT INTO sale_order_recommendation_history (
+                company_id, commercial_partner_id, partner_shipping_id,
+                product_id, month, times_delivered, units_delivered,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT key.company_id, key.commercial_partner_id,
+                key.partner_shipping_id, key.product_id, key.month, 0, 0,
+                %(uid)s, now() at time zone 'UTC',
+                %(uid)s, now() at time zone 'UTC'
+            FROM unnest(
+                %(company_ids)s::integer[], %(partner_ids)s::integer[],
+                %(shipping_ids)s::integer[], %(product_ids)s::integer[],
+                %(months)s::date[]
+            ) AS key(
+                company_id, commercial_partner_id, partner_shipping_id,
+                product_id, month
+            )
+            ON CONFLICT DO NOTHING
+            """,
+            params,
+        )
+        self.env.cr.execute(
+            """
+            SELECT history.company_id, history.commercial_partner_id,
+                history.partner_shipping_id, history.product_id, history.month,
+                history.id
+            FROM sale_order_recommendation_history history
+            JOIN unnest(
+                %(company_ids)s::integer[], %(partner_ids)s::integer[],
+                %(shipping_ids)s::integer[], %(product_ids)s::integer[],
+                %(months)s::date[]
+            ) AS key(
+                company_id, commercial_partner_id, partner_shipping_id,
+                product_id, month
+            )
+            ON history.company_id = key.company_id
+            AND history.commercial_partner_id = key.commercial_partner_id
+            AND history.partner_shipping_id = key.partner_shipping_id
+            AND history.product_id = key.product_id
+            AND history.month = key.month
+            """,
+            params,
+        )
+        return {tuple(row[:5]): row[5] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def _init_from_sale_lines(self):
+        """Fill the histories from the existing sales order lines"""
+        self.env["sale.order.line"].flush_model()
+        self.env["sale.order"].flush_model()
+        delivery_filter = ""
+        if "is_delivery" in self.env["sale.order.line"]._fields:
+            delivery_filter = "AND NOT COALESCE(line.is_delivery, FALSE)"
+        # Same lines as the ones of sale.order.line._get_recommendation_history_key
+        self.env.cr.execute(
+            """
+            CREATE TEMPORARY TABLE sale_order_recommendation_history_key
+            ON COMMIT DROP AS
+            SELECT line.id AS line_id, line.company_id,
+                partner.commercial_partner_id, so.partner_shipping_id,
+                line.product_id,
+                date_trunc('month', so.date_order)::date AS month,
+                line.qty_delivered
+            FROM sale_order_line line
+            JOIN sale_order so ON so.id = line.order_id
+            JOIN res_partner partner ON partner.id = so.partner_id
+            WHERE line.product_id IS NOT NULL
+            AND line.display_type IS NULL
+            AND so.date_order IS NOT NULL
+            AND so.partner_shipping_id IS NOT NULL
+            """
+            + delivery_filter
+        )
+        self.env.cr.execute(
+            """
+            INSERT INTO sale_order_recommendation_history (
+                company_id, commercial_partner_id, partner_shipping_id,
+                product_id, month, times_delivered, units_delivered,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT company_id, commercial_partner_id, partner_shipping_id,
+                product_id, month,
+                count(*) FILTER (WHERE qty_delivered != 0),
+                COALESCE(sum(qty_delivered), 0),
+                %(uid)s, now() at time zone 'UTC',
+                %(uid)s, now() at time zone 'UTC'
+            FROM sale_order_recommendation_history_key
+            GROUP BY company_id, commercial_partner_id, partner_shipping_id,
+                product_id, month
+            ON CONFLICT DO NOTHING
+            """,
+            {"uid": self.env.uid},
+        )
+        self.env.cr.execute(
+            """
+            UPDATE sale_order_line line
+            SET recommendation_history_id = history.id
+            FROM sale_order_recommendation_history_key key
+            JOIN sale_order_recommendation_history history
+                ON history.company_id = key.company_id
+                AND history.commercial_partner_id = key.commercial_partner_id
+                AND history.partner_shipping_id = key.partner_shipping_id
+                AND history.product_id = key.product_id
+                AND history.month = key.month
+            WHERE line.id = key.line_id
+            """
+        )
+        self.env.cr.execute("DROP TABLE sale_order_recommendation_history_key")
+        self.env["sale.order.line"].invalidate_model(["recommendation_history_id"])
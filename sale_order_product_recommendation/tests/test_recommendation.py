@@ -3,6 +3,9 @@
 # Copyright 2021 Tecnativa - Víctor Martínez
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from datetime import date
+from unittest import mock
+
 from freezegun import freeze_time
 
 from odoo.exceptions import UserError
@@ -271,6 +274,51 @@ class RecommendationCaseTests(RecommendationCase):
         wiz_line_prod2 = wizard.line_ids.filtered(lambda x: x.product_id == self.prod_2)
         self.assertEqual(wiz_line_prod2.price_unit, 89.00)
 
+    def test_recommendations_pricelist_quantity(self):
+        self.pricelist.sudo().item_ids = [
+            (
+                0,
+                0,
+                {
+                    "applied_on": "0_product_variant",
+                    "product_id": self.prod_1.id,
+                    "min_quantity": 10,
+                    "compute_price": "fixed",
+                    "fixed_price": 20.0,
+                },
+            )
+        ]
+        self.new_so.pricelist_id = self.pricelist
+        wizard = self.wizard()
+        wiz_line_prod1 = wizard.line_ids.filtered(lambda x: x.product_id == self.prod_1)
+        wiz_line_prod2 = wizard.line_ids.filtered(lambda x: x.product_id == self.prod_2)
+        self.assertEqual(wiz_line_prod1.price_unit, 25.00)
+        wiz_line_prod1.units_included = 10
+        wiz_line_prod2.units_included = 10
+        self.assertEqual(wiz_line_prod1.price_unit, 20.00)
+        self.assertEqual(wiz_line_prod2.price_unit, 50.00)
+
+    def test_recommendations_last_sale_prices_cached(self):
+        wizard = self.wizard()
+        wizard.sale_recommendation_price_origin = "last_sale_price"
+        self.assertEqual(
+            wizard.last_sale_prices,
+            {
+                str(self.prod_1.id): 24.50,
+                str(self.prod_2.id): 49.50,
+                str(self.prod_3.id): 74.50,
+            },
+        )
+        # Prices are not read again when the included units change
+        with mock.patch.object(
+            type(wizard), "_get_last_sale_prices"
+        ) as get_last_sale_prices:
+            wizard.line_ids.units_included = 2
+            self.assertEqual(
+                wizard.line_ids.mapped("price_unit"), [49.50, 24.50, 74.50]
+            )
+        get_last_sale_prices.assert_not_called()
+
     def test_recommendations_last_sale_price_to_sale_order(self):
         # Display product price from last sale order price
         wizard = self.wizard()
@@ -348,6 +396,71 @@ class RecommendationCaseTests(RecommendationCase):
         wizard.generate_recommendations()
         self.assertNotIn("service", wizard.line_ids.mapped("product_id.type"))
 
+    def test_recommendation_history(self):
+        line_prod1 = self.order1.order_line.filtered(
+            lambda x: x.product_id == self.prod_1
+        )
+        history = line_prod1.recommendation_history_id
+        self.assertRecordValues(
+            history,
+            [
+                {
+                    "commercial_partner_id": self.partner.id,
+                    "partner_shipping_id": self.partner.id,
+                    "product_id": self.prod_1.id,
+                    "month": date(2021, 5, 1),
+                    "times_delivered": 1,
+                    "units_delivered": 25,
+                }
+            ],
+        )
+        line_prod1.qty_delivered = 10
+        self.assertEqual(history.units_delivered, 10)
+        self.order1.date_order = "2021-08-10"
+        self.assertEqual(line_prod1.recommendation_history_id.month, date(2021, 8, 1))
+        self.assertEqual(history.times_delivered, 0)
+        # Recommendations start on 2021-04-05, in the middle of a month
+        for date_order in ("2021-04-04", "2021-04-06"):
+            self.env["sale.order"].create(
+                {
+                    "partner_id": self.partner.id,
+                    "date_order": date_order,
+                    "order_line": [
+                        (
+                            0,
+                            0,
+                            {
+                                "product_id": self.prod_3.id,
+                                "product_uom_qty": 10,
+                                "qty_delivered_method": "manual",
+                                "qty_delivered": 10,
+                            },
+                        ),
+                    ],
+                }
+            )
+        wizard = self.wizard()
+        self.assertRecordValues(
+            wizard.line_ids,
+            [
+                {
+                    "product_id": self.prod_3.id,
+                    "times_delivered": 2,
+                    "units_delivered": 110,
+                },
+                {
+                    "product_id": self.prod_2.id,
+                    "times_delivered": 2,
+                    "units_delivered": 100,
+                },
+                {
+                    "product_id": self.prod_1.id,
+                    "times_delivered": 1,
+                    "units_delivered": 10,
+                },
+            ],
+        )
+
     def test_no_recommendations_found(self):
         new_partner = self.partner.copy()
         self.new_so.partner_id = new_partner
@@ -3,8 +3,11 @@
 # Copyright 2020 Tecnativa - Pedro M. Baeza
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+from dateutil.relativedelta import relativedelta
+
 from odoo import _, api, fields, models
 from odoo.exceptions import UserError
 from odoo.osv import expression
@@ -46,6 +49,11 @@ class SaleOrderRecommendation(models.TransientModel):
         string="Product price origin",
         default="pricelist",
     )
+    last_sale_prices = fields.Json(
+        compute="_compute_last_sale_prices",
+        store=True,
+        help="Last sale price of each recommended product, by product id.",
+    )
     use_delivery_address = fields.Boolean(string="Use delivery address")
     recommendations_order = fields.Selection(
         [
@@ -63,12 +71,63 @@ class SaleOrderRecommendation(models.TransientModel):
     def _default_order_id(self):
         return self.env.context.get("active_id", False)
 
+    @api.depends("sale_recommendation_price_origin", "line_ids.product_id")
+    def _compute_last_sale_prices(self):
+        for wizard in self:
+            if wizard.sale_recommendation_price_origin != "last_sale_price":
+                wizard.last_sale_prices = False
+                continue
+            wizard.last_sale_prices = wizard._get_last_sale_prices(
+                wizard.line_ids.product_id
+            )
+
+    def _get_last_sale_prices(self, products):
+        """Get the price of the products in the last order of the customer
+        containing them, as a dictionary {str(product id): price}.
+        Use SQL to read sale orders from other users like as other commercials.
+        """
+        self.ensure_one()
+        if not products:
+            return {}
+        self.env["sale.order"].flush_model(
+            ["company_id", "partner_id", "date_order", "state"]
+        )
+        self.env["sale.order.line"].flush_model(
+            ["order_id", "product_id", "price_unit"]
+        )
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT ON (sol.product_id) sol.product_id, sol.price_unit
+            FROM sale_order_line sol
+            JOIN sale_order so ON so.id = sol.order_id
+            WHERE so.company_id = %s
+            AND so.partner_id = %s
+            AND so.date_order IS NOT NULL
+            AND so.state NOT IN ('draft', 'sent', 'cancel')
+            AND sol.product_id IN %s
+            ORDER BY sol.product_id, so.date_order DESC, so.id DESC, sol.id DESC
+            """,
+            (
+                self.order_id.company_id.id,
+                self.order_id.partner_id.id,
+                tuple(products.ids),
+            ),
+        )
+        prices = {str(product_id): 0.0 for product_id in products.ids}
+        prices.update(
+            (str(product_id), price_unit or 0.0)
+            for product_id, price_unit in self.env.cr.fetchall()
+        )
+        return prices
+
     def _extended_recommendable_sale_order_lines_domain(self):
         """Extra domain to include or exclude SO lines"""
         return safe_eval(self.env.user.company_id.sale_line_recommendation_domain)
 
-    def _recommendable_sale_order_lines_domain(self):
-        """Domain to find recent SO lines."""
+    def _recommendable_sale_order_lines_domain(self, date_to=False):
+        """Domain to find recent SO lines.
+        @param date_to: Optional datetime to only find SO lines before it
+        """
         start = datetime.now() - timedelta(days=self.months * 30)
         start = fields.Datetime.to_string(start)
         partner = (
@@ -79,18 +138,17 @@ class SaleOrderRecommendation(models.TransientModel):
         sale_order_partner_field = (
             "partner_shipping_id" if self.use_delivery_address else "partner_id"
         )
-        # Search with sudo for get sale order from other commercials users
-        other_sales = (
-            self.env["sale.order"]
-            .sudo()
-            .search(
-                [
-                    ("company_id", "=", self.order_id.company_id.id),
-                    (sale_order_partner_field, "child_of", partner.id),
-                    ("date_order", ">=", start),
-                ]
+        sale_order_domain = [
+            ("company_id", "=", self.order_id.company_id.id),
+            (sale_order_partner_field, "child_of", partner.id),
+            ("date_order", ">=", start),
+        ]
+        if date_to:
+            sale_order_domain.append(
+                ("date_order", "<", fields.Datetime.to_string(date_to))
             )
-        )
+        # Search with sudo for get sale order from other commercials users
+        other_sales = self.env["sale.order"].sudo().search(sale_order_domain)
         domain = [
             ("order_id", "in", (other_sales - self.order_id).ids),
             ("product_id.active", "=", True),
@@ -106,6 +164,88 @@ class SaleOrderRecommendation(models.TransientModel):
         domain = expression.AND([domain, extended_domain])
         return domain
 
+    def _recommendable_history_domain(self, month_from):
+        """Domain to find the recommendation histories from a month."""
+        if self.use_delivery_address:
+            partner = self.order_id.partner_shipping_id
+            partner_domain = [("partner_shipping_id", "child_of", partner.id)]
+        else:
+            partner = self.order_id.partner_id.commercial_partner_id
+            partner_domain = [("commercial_partner_id", "=", partner.id)]
+        domain = [
+            ("company_id", "=", self.order_id.company_id.id),
+            ("month", ">=", month_from),
+            ("product_id.active", "=", True),
+            ("product_id.sale_ok", "=", True),
+            ("times_delivered", ">", 0),
+        ]
+        return expression.AND([domain, partner_domain])
+
+    def _get_recommendable_products(self):
+        """Products delivered in previous months, in the format of the
+        sale.order.line read_group grouped by product."""
+        # Search with sudo for get sale order from other commercials users
+        sale_line_obj = self.env["sale.order.line"].sudo()
+        if self._extended_recommendable_sale_order_lines_domain():
+            # The histories can't filter on the extra domain of the lines
+            return sale_line_obj.read_group(
+                self._recommendable_sale_order_lines_domain(),
+                ["product_id", "qty_delivered"],
+                ["product_id"],
+            )
+        # The histories are monthly, so the lines of the first month are
+        # still read from the sales order lines
+        start = datetime.now() - timedelta(days=self.months * 30)
+        month_from = start.replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        ) + relativedelta(months=1)
+        found_dict = {
+            group["product_id"][0]: group
+            for group in sale_line_obj.read_group(
+                self._recommendable_sale_order_lines_domain(date_to=month_from),
+                ["product_id", "qty_delivered"],
+                ["product_id"],
+            )
+        }
+        histories = (
+            self.env["sale.order.recommendation.history"]
+            .sudo()
+            .read_group(
+                self._recommendable_history_domain(month_from.date()),
+                ["times_delivered:sum", "units_delivered:sum", "ids:array_agg(id)"],
+                ["product_id"],
+            )
+        )
+        # Deliveries of the current order are not recommendations
+        own_qtys = defaultdict(list)
+        for line in self.order_id.sudo().order_line:
+            if line.qty_delivered:
+                own_qtys[line.recommendation_history_id.id].append(line.qty_delivered)
+        for history in histories:
+            qtys = [qty for h_id in history["ids"] for qty in own_qtys.get(h_id, [])]
+            times_delivered = history["times_delivered"] - len(qtys)
+            if times_delivered <= 0:
+                continue
+            units_delivered = history["units_delivered"] - sum(qtys)
+            lines_domain = [
+                ("recommendation_history_id", "in", history["ids"]),
+                ("order_id", "!=", self.order_id.id),
+                ("qty_delivered", "!=", 0.0),
+            ]
+            group = found_dict.get(history["product_id"][0])
+            if group:
+                group["product_id_count"] += times_delivered
+                group["qty_delivered"] += units_delivered
+                group["__domain"] = expression.OR([group["__domain"], lines_domain])
+            else:
+                found_dict[history["product_id"][0]] = {
+                    "product_id": history["product_id"],
+                    "product_id_count": times_delivered,
+                    "qty_delivered": units_delivered,
+                    "__domain": lines_domain,
+                }
+        return list(found_dict.values())
+
     def _prepare_recommendation_line_vals(self, group_line, so_line=False):
         """Return the vals dictionary for creating a new recommendation line.
         @param group_line: Dictionary returned by the read_group operation.
@@ -139,16 +279,7 @@ class SaleOrderRecommendation(models.TransientModel):
     def generate_recommendations(self):
         """Generate lines according to context sale order."""
         # Search delivered products in previous months
-        # Search with sudo for get sale order from other commercials users
-        found_lines = (
-            self.env["sale.order.line"]
-            .sudo()
-            .read_group(
-                self._recommendable_sale_order_lines_domain(),
-                ["product_id", "qty_delivered"],
-                ["product_id"],
-            )
-        )
+        found_lines = self._get_recommendable_products()
         # Manual ordering that circumvents ORM limitations
         found_lines = sorted(
             found_lines,
@@ -297,6 +428,7 @@ class SaleOrderRecommendationLine(models.TransientModel):
         "pricelist_id",
         "units_included",
         "wizard_id.sale_recommendation_price_origin",
+        "wizard_id.last_sale_prices",
     )
     def _compute_price_unit(self):
         """
@@ -305,9 +437,11 @@ class SaleOrderRecommendationLine(models.TransientModel):
         price_origin = (
             fields.first(self).wizard_id.sale_recommendation_price_origin or "pricelist"
         )
+        if price_origin == "pricelist":
+            pricelist_prices = self._get_unit_prices_from_pricelist()
         for line in self:
             if price_origin == "pricelist":
-                line.price_unit = line._get_unit_price_from_pricelist()
+                line.price_unit = pricelist_prices.get(line, 0.0)
             else:
                 line.price_unit = line._get_last_sale_price_product()
 
@@ -350,58 +484,52 @@ class SaleOrderRecommendationLine(models.TransientModel):
     def _get_last_sale_price_product(self):
         """
         Get last price from last order.
-        Use sudo to read sale order from other users like as other commercials.
+        The prices of all the wizard products are read at once and kept in the
+        wizard until its products or its price origin change.
         """
         self.ensure_one()
-        so = (
-            self.env["sale.order"]
-            .sudo()
-            .search(
-                [
-                    ("company_id", "=", self.wizard_id.order_id.company_id.id),
-                    ("partner_id", "=", self.partner_id.id),
-                    ("date_order", "!=", False),
-                    ("state", "not in", ("draft", "sent", "cancel")),
-                    ("order_line.product_id", "=", self.product_id.id),
-                ],
-                limit=1,
-                order="date_order DESC, id DESC",
-            )
-        )
-        so_line = (
-            self.env["sale.order.line"]
-            .sudo()
-            .search(
-                [("order_id", "=", so.id), ("product_id", "=", self.product_id.id)],
-                limit=1,
-                order="id DESC",
-            )
-            .with_context(prefetch_fields=False)
-        )
-        return so_line.price_unit or 0.0
+        if not self.product_id:
+            return 0.0
+        product_key = str(self.product_id.id)
+        prices = self.wizard_id.last_sale_prices or {}
+        if product_key not in prices:
+            prices = self.wizard_id._get_last_sale_prices(self.product_id)
+        return prices[product_key]
 
     def _get_unit_price_from_pricelist(self):
-        pricelist_rule_id = self.pricelist_id._get_product_rule(
-            self.product_id,
-            self.units_included or 1.0,
-            uom=self.sale_uom_id or self.product_id.uom_id,
-            date=self.wizard_id.order_id.date_order,
-        )
-        pricelist_rule = self.env["product.pricelist.item"].browse(pricelist_rule_id)
-        price_rule = pricelist_rule._compute_price(
-            self.product_id,
-            self.units_included,
-            self.sale_uom_id or self.product_id.uom_id,
-            self.wizard_id.order_id.date_order,
-            currency=self.currency_id,
-        )
-        price_unit = self.product_id._get_tax_included_unit_price(
-            self.wizard_id.order_id.company_id,
-            self.currency_id,
-            self.wizard_id.order_id.date_order,
-            "sale",
-            fiscal_position=self.wizard_id.order_id.fiscal_position_id,
-            product_price_unit=price_rule,
-            product_currency=self.currency_id,
-        )
-        return price_unit
+        self.ensure_one()
+        return self._get_unit_prices_from_pricelist().get(self, 0.0)
+
+    def _get_unit_prices_from_pricelist(self):
+        """Get the pricelist price of the lines as a dictionary {line: price}.
+        The pricelist rules are evaluated at once for all the products sharing
+        pricelist, date, quantity and unit of measure.
+        """
+        lines_by_key = defaultdict(lambda: self.browse())
+        for line in self.filtered("product_id"):
+            order = line.wizard_id.order_id
+            key = (
+                order.pricelist_id,
+                order.date_order,
+                line.units_included or 1.0,
+                line.sale_uom_id or line.product_id.uom_id,
+                line.currency_id,
+            )
+            lines_by_key[key] |= line
+        prices = {}
+        for (pricelist, date, qty, uom, currency), lines in lines_by_key.items():
+            rule_prices = pricelist._compute_price_rule(
+                lines.product_id, qty, currency=currency, uom=uom, date=date
+            )
+            for line in lines:
+                order = line.wizard_id.order_id
+                prices[line] = line.product_id._get_tax_included_unit_price(
+                    order.company_id,
+                    currency,
+                    date,
+                    "sale",
+                    fiscal_position=order.fiscal_position_id,
+                    product_price_unit=rule_prices[line.product_id.id][0],
+                    product_currency=currency,
+                )
+        return prices
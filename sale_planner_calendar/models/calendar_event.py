@@ -130,15 +130,22 @@ class CalendarEvent(models.Model):
             groupby=["partner_id"],
         )
         invoice_dic = {g["partner_id"][0]: g["amount_residual_signed"] for g in groups}
+        payment_groups = self.env["sale.payment.sheet.line"]._read_group(
+            domain=[
+                ("sale_planner_calendar_event_id", "in", self._origin.ids),
+                ("sheet_id.state", "=", "open"),
+            ],
+            fields=["amount"],
+            groupby=["sale_planner_calendar_event_id"],
+        )
+        payment_dic = {
+            g["sale_planner_calendar_event_id"][0]: g["amount"] for g in payment_groups
+        }
         for rec in self:
             amount_residual = invoice_dic.get(
                 rec.target_partner_id.commercial_partner_id.id, 0.0
             )
-            payment_amount = sum(
-                rec.payment_sheet_line_ids.filtered(
-                    lambda p: p.sheet_id.state == "open"
-                ).mapped("amount")
-            )
+            payment_amount = payment_dic.get(rec._origin.id, 0.0)
             rec.invoice_amount_residual = amount_residual - payment_amount
 
     @api.depends("target_partner_id")
@@ -161,10 +168,18 @@ class CalendarEvent(models.Model):
 
     @api.depends("target_partner_id")
     def _compute_contact(self):
+        # First planner contact of each partner, in the order of child_ids
+        contacts = self.env["res.partner"].search(
+            [
+                ("parent_id", "in", self.target_partner_id.ids),
+                ("is_sale_planner_contact", "=", True),
+            ]
+        )
+        contact_dic = {}
+        for contact in contacts:
+            contact_dic.setdefault(contact.parent_id.id, contact)
         for rec in self:
-            contact = rec.target_partner_id.child_ids.filtered(
-                "is_sale_planner_contact"
-            )[:1]
+            contact = contact_dic.get(rec.target_partner_id.id, self.env["res.partner"])
             rec.partner_mobile = (contact.mobile or contact.phone) or (
                 rec.target_partner_id.mobile or rec.target_partner_id.phone
             )
@@ -399,37 +414,45 @@ class CalendarEvent(models.Model):
                 days_count += 1
         return days_count
 
-    def _get_recurrent_dates_by_event(self):
-        dates_list = super()._get_recurrent_dates_by_event()
-        if not self.advanced_cycle:
-            return dates_list
-        new_dates = []
-        index = 0
-        skip_count = 0
-
+    def _get_advanced_cycle_dates(self, dates_list):
+        """Keep the dates of the advanced cycle: the occurrence in position
+        ``index`` is kept when it falls in the first ``cycle_number`` positions
+        of its period of ``cycle_number + cycle_skip`` occurrences.
+        """
         cycle_number = self.cycle_number
         cycle_skip = self.cycle_skip
         if self.rrule_type == "weekly":
             days_count = self.get_week_days_count()
             cycle_number *= days_count
             cycle_skip *= days_count
-        for dates in dates_list:
-            if index < cycle_number:
-                new_dates.append(dates)
-                index += 1
-            else:
-                skip_count += 1
-                if skip_count >= cycle_skip:
-                    index = 0
-                    skip_count = 0
-        return new_dates
+        # At least one occurrence is skipped at the end of every cycle
+        period = cycle_number + max(cycle_skip, 1)
+        return [
+            dates
+            for index, dates in enumerate(dates_list)
+            if index % period < cycle_number
+        ]
+
+    def _get_recurrent_dates_by_event(self):
+        dates_list = super()._get_recurrent_dates_by_event()
+        if not self.advanced_cycle:
+            return dates_list
+        return self._get_advanced_cycle_dates(dates_list)
 
     @api.model
     def cron_update_dynamic_final_date(self):
-        events_to_update = self.search(
-            [("is_dynamic_end_date", "=", True), ("is_base_recurrent_event", "=", True)]
-        )
         new_date = fields.Date.today() + relativedelta(
             months=self.env.company.sale_planner_forward_months, day=31
         )
+        # The final date only changes once a month, so the recurrences already
+        # ending at the new date are not written again.
+        events_to_update = self.search(
+            [
+                ("is_dynamic_end_date", "=", True),
+                ("is_base_recurrent_event", "=", True),
+                "|",
+                ("until", "=", False),
+                ("until", "!=", new_date),
+            ]
+        )
         events_to_update.until = new_date
@@ -1,6 +1,7 @@
 # Copyright 2021 Tecnativa - Sergio Teruel
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
-from datetime import timedelta
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 
 import pytz
 
@@ -45,26 +46,39 @@ class SalePlannerCalendarSummary(models.Model):
     )
     comment = fields.Text()
     sale_order_subtotal = fields.Monetary(
-        compute="_compute_sale_ids", currency_field="currency_id"
+        compute="_compute_sale_order_totals", currency_field="currency_id", store=True
     )
     event_type_id = fields.Many2one(
         comodel_name="calendar.event.type",
         string="Event type",
     )
-    # Summary data results
-    event_total_count = fields.Integer(compute="_compute_event_planner_count")
-    event_done_count = fields.Integer(compute="_compute_event_planner_count")
-    event_effective_count = fields.Integer(compute="_compute_event_planner_count")
-    event_off_planning_count = fields.Integer(compute="_compute_event_planner_count")
-    sale_order_count = fields.Integer(compute="_compute_sale_ids")
-    payment_count = fields.Integer(compute="_compute_event_planner_count")
-    payment_amount = fields.Monetary(compute="_compute_event_planner_count")
+    # Summary data results, stored to be recomputed only for the summaries
+    # of the changed events and to be aggregated by the reporting views
+    event_total_count = fields.Integer(
+        compute="_compute_event_planner_count", store=True
+    )
+    event_done_count = fields.Integer(
+        compute="_compute_event_planner_count", store=True
+    )
+    event_effective_count = fields.Integer(
+        compute="_compute_event_planner_count", store=True
+    )
+    event_off_planning_count = fields.Integer(
+        compute="_compute_event_planner_count", store=True
+    )
+    sale_order_count = fields.Integer(compute="_compute_sale_order_totals", store=True)
+    payment_count = fields.Integer(compute="_compute_event_planner_count", store=True)
+    payment_amount = fields.Monetary(compute="_compute_event_planner_count", store=True)
 
-    @api.depends("sale_planner_calendar_event_ids")
+    @api.depends("sale_planner_calendar_event_ids.sale_ids")
     def _compute_sale_ids(self):
+        for rec in self:
+            rec.sale_ids = rec.sale_planner_calendar_event_ids.mapped("sale_ids")
+
+    @api.depends("sale_planner_calendar_event_ids.sale_ids.amount_untaxed")
+    def _compute_sale_order_totals(self):
         for rec in self:
             sales = rec.sale_planner_calendar_event_ids.mapped("sale_ids")
-            rec.sale_ids = sales
             rec.sale_order_subtotal = sum(sales.mapped("amount_untaxed"))
             rec.sale_order_count = len(sales)
 
@@ -73,6 +87,7 @@ class SalePlannerCalendarSummary(models.Model):
         "sale_planner_calendar_event_ids.sale_planner_state",
         "sale_planner_calendar_event_ids.sale_ids",
         "sale_planner_calendar_event_ids.off_planning",
+        "sale_planner_calendar_event_ids.payment_sheet_line_ids.amount",
     )
     def _compute_event_planner_count(self):
         for summary in self:
@@ -280,6 +295,147 @@ class SalePlannerCalendarSummary(models.Model):
         )
         sales.action_set_planner_calendar_event(self)
 
+    @api.model
+    def cron_process_summaries(self, days=1):
+        """Create and process the summaries of the last days of every salesperson"""
+        date_to = fields.Date.context_today(self)
+        self._process_summaries(date_to - timedelta(days=days - 1), date_to)
+
+    @api.model
+    def _get_user_tz(self, user):
+        return pytz.timezone(user.tz or self.env.user.tz or "UTC")
+
+    @api.model
+    def _get_local_date(self, user_tz, date_time, hour_float=0.0):
+        """Date of an UTC datetime in the given time zone, the days starting
+        at the given hour.
+        """
+        local_datetime = (
+            pytz.utc.localize(date_time).astimezone(user_tz).replace(tzinfo=None)
+        )
+        return (local_datetime - timedelta(hours=hour_float)).date()
+
+    @api.model
+    def _get_summary_for_event(self, summaries, event):
+        """Summary of the event among the ones of its user and day, the one of
+        its event type first.
+        """
+        return (
+            summaries.filtered(lambda sm: sm.event_type_id in event.categ_ids)[:1]
+            or summaries.filtered(lambda sm: not sm.event_type_id)[:1]
+        )
+
+    @api.model
+    def _process_summaries(self, date_from, date_to, users=None):
+        """Batch version of action_process for all the salespersons, or the
+        given ones, from date_from to date_to.
+
+        The summaries of the days with planned events are created when
+        missing, the events are bound to them and the orders taken off
+        planning are bound to their events, creating the off planning events.
+        """
+        # Wide enough for any time zone and cut hour, the local dates are
+        # checked below.
+        datetime_from = datetime.combine(date_from - timedelta(days=1), time.min)
+        datetime_to = datetime.combine(date_to + timedelta(days=2), time.min)
+        event_domain = [
+            ("start", ">=", datetime_from),
+            ("start", "<", datetime_to),
+            ("target_partner_id", "!=", False),
+            ("user_id", "!=", False),
+        ]
+        summary_domain = [("date", ">=", date_from), ("date", "<=", date_to)]
+        if users is not None:
+            event_domain.append(("user_id", "in", users.ids))
+            summary_domain.append(("user_id", "in", users.ids))
+        events = self.env["calendar.event"].search(event_domain, order="start")
+        summaries = self.search(summary_domain)
+        planner_users = events.user_id | summaries.user_id
+        tz_by_user = {user.id: self._get_user_tz(user) for user in planner_users}
+        summaries_by_key = defaultdict(self.browse)
+        for summary in summaries:
+            summaries_by_key[(summary.user_id.id, summary.date)] |= summary
+        # Planned events by user and day
+        events_to_bind = defaultdict(list)
+        for event in events.filtered(lambda ev: not ev.calendar_summary_id):
+            user_id = event.user_id.id
+            event_date = self._get_local_date(tz_by_user[user_id], event.start)
+            if date_from <= event_date <= date_to:
+                events_to_bind[(user_id, event_date)].append(event)
+        # A summary without event type is created for the events matching
+        # none of the summaries of their day
+        new_keys = [
+            key
+            for key, key_events in events_to_bind.items()
+            if not summaries_by_key[key].filtered(lambda sm: not sm.event_type_id)
+            and any(
+                not self._get_summary_for_event(summaries_by_key[key], event)
+                for event in key_events
+            )
+        ]
+        new_summaries = self.create(
+            [{"user_id": user_id, "date": date} for user_id, date in new_keys]
+        )
+        for key, summary in zip(new_keys, new_summaries):
+            summaries_by_key[key] |= summary
+        event_ids_by_summary = defaultdict(list)
+        for key, key_events in events_to_bind.items():
+            for event in key_events:
+                summary = self._get_summary_for_event(summaries_by_key[key], event)
+                if summary:
+                    event_ids_by_summary[summary].append(event.id)
+        for summary, event_ids in event_ids_by_summary.items():
+            self.env["calendar.event"].browse(event_ids).calendar_summary_id = summary
+        # Orders taken off planning, each day starting at the cut hour
+        cut_hour = self.env.company.sale_planner_order_cut_hour
+        events_by_key = {}
+        for event in events:
+            user_id = event.user_id.id
+            key = (
+                user_id,
+                event.target_partner_id.id,
+                self._get_local_date(tz_by_user[user_id], event.start, cut_hour),
+            )
+            events_by_key.setdefault(key, event)
+        orders = self.env["sale.order"].search(
+            [
+                ("user_id", "in", planner_users.ids),
+                ("date_order", ">=", datetime_from),
+                ("date_order", "<", datetime_to),
+                ("sale_planner_calendar_event_id", "=", False),
+            ]
+        )
+        order_ids_by_event = defaultdict(list)
+        orders_off_planning = []
+        event_vals_list = []
+        for order in orders:
+            user_id = order.user_id.id
+            order_date = self._get_local_date(
+                tz_by_user[user_id], order.date_order, cut_hour
+            )
+            if not date_from <= order_date <= date_to:
+                continue
+            event = events_by_key.get((user_id, order.partner_id.id, order_date))
+            if event:
+                order_ids_by_event[event].append(order.id)
+                continue
+            # Sorted to select first summary without event_type
+            order_summaries = summaries_by_key[(user_id, order_date)]
+            summary = order_summaries.sorted("event_type_id")[:1]
+            if not summary:
+                continue
+            event_vals = order._prepare_calendar_event_planner()
+            event_vals["calendar_summary_id"] = summary.id
+            event_vals_list.append(event_vals)
+            orders_off_planning.append(order)
+        new_events = self.env["calendar.event"].create(event_vals_list)
+        for order, event in zip(orders_off_planning, new_events):
+            order_ids_by_event[event].append(order.id)
+        for event, order_ids in order_ids_by_event.items():
+            self.env["sale.order"].browse(
+                order_ids
+            ).sale_planner_calendar_event_id = event
+
     @api.model
     def _get_datetime_from_date_tz_hour(self, date, hour_float):
         """
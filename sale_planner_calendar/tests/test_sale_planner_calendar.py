@@ -2,7 +2,9 @@
 # License AGPL-3.0 or later (https://www.gnu.org/licenses/agpl).
 
 from datetime import date, timedelta
+from unittest.mock import patch
 
+from dateutil.relativedelta import relativedelta
 from freezegun import freeze_time
 
 from odoo.exceptions import AccessError
@@ -202,6 +204,47 @@ class TestSalePlannerCalendar(TransactionCase):
             event.target_partner_id._display_address(True).replace("\n", " "),
         )
 
+    def test_advanced_cycle_dates(self):
+        event = self.CalendarEvent.new(
+            {
+                "rrule_type": "daily",
+                "advanced_cycle": True,
+                "cycle_number": 2,
+                "cycle_skip": 1,
+            }
+        )
+        dates_list = list(range(10))
+        self.assertEqual(
+            event._get_advanced_cycle_dates(dates_list), [0, 1, 3, 4, 6, 7, 9]
+        )
+        # One occurrence is skipped at the end of every cycle at least
+        event.cycle_skip = 0
+        self.assertEqual(
+            event._get_advanced_cycle_dates(dates_list), [0, 1, 3, 4, 6, 7, 9]
+        )
+        event.cycle_skip = 3
+        self.assertEqual(event._get_advanced_cycle_dates(dates_list), [0, 1, 5, 6])
+
+    def test_cron_update_dynamic_final_date(self):
+        new_date = date.today() + relativedelta(
+            months=self.env.company.sale_planner_forward_months, day=31
+        )
+        base_events = self.planned_events.filtered("is_base_recurrent_event")
+        updated_event = base_events[0]
+        updated_event.until = new_date
+        event_class = type(self.CalendarEvent)
+        with patch.object(
+            event_class, "write", autospec=True, side_effect=event_class.write
+        ) as write_mock:
+            self.CalendarEvent.cron_update_dynamic_final_date()
+        written_events = self.CalendarEvent.browse()
+        for call in write_mock.call_args_list:
+            if call.args[1] == {"until": new_date}:
+                written_events |= call.args[0]
+        # Only the recurrences ending at another date are written
+        self.assertEqual(written_events, base_events - updated_event)
+        self.assertEqual(set(base_events.mapped("until")), {new_date})
+
     def test_planner_calendar_wizard(self):
         wiz_form = Form(self.env["sale.planner.calendar.wizard"])
         # This user has three planned events
@@ -237,6 +280,143 @@ class TestSalePlannerCalendar(TransactionCase):
         self.assertEqual(summary.event_total_count, 2)
         self.assertEqual(summary.event_done_count, 1)
         self.assertEqual(summary.event_effective_count, 1)
+        # Counters are stored, so the reporting views can aggregate them
+        totals = summary_obj.read_group(
+            [("id", "=", summary.id)],
+            ["event_done_count:sum", "sale_order_subtotal:sum"],
+            [],
+        )[0]
+        self.assertEqual(totals["event_done_count"], 1)
+        self.assertEqual(totals["sale_order_subtotal"], 200)
+
+    def test_process_summaries(self):
+        summary_obj = self.env["sale.planner.calendar.summary"]
+        summary_obj._process_summaries(
+            date.today(), date.today(), users=self.commercial_user_1
+        )
+        summary = summary_obj.search([("user_id", "=", self.commercial_user_1.id)])
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary.date, date.today())
+        self.assertEqual(summary.event_total_count, 2)
+        # Orders out of the planning are bound to an off planning event
+        so_form = Form(self.SaleOrder)
+        so_form.partner_id = self.partner_3
+        so_form.user_id = self.commercial_user_1
+        with so_form.order_line.new() as line_form:
+            line_form.product_id = self.product
+        order = so_form.save()
+        self.assertFalse(order.sale_planner_calendar_event_id)
+        summary_obj._process_summaries(
+            date.today(), date.today(), users=self.commercial_user_1
+        )
+        self.assertEqual(
+            summary_obj.search([("user_id", "=", self.commercial_user_1.id)]),
+            summary,
+        )
+        self.assertTrue(order.sale_planner_calendar_event_id.off_planning)
+        self.assertEqual(
+            order.sale_planner_calendar_event_id.calendar_summary_id, summary
+        )
+        self.assertEqual(summary.event_off_planning_count, 1)
+
+    def test_process_summaries_event_type(self):
+        summary_obj = self.env["sale.planner.calendar.summary"]
+        delivery_summary = summary_obj.create(
+            {
+                "user_id": self.commercial_user_1.id,
+                "date": date.today(),
+                "event_type_id": self.event_type_delivery.id,
+            }
+        )
+        summary_obj._process_summaries(
+            date.today(), date.today(), users=self.commercial_user_1
+        )
+        summaries = summary_obj.search([("user_id", "=", self.commercial_user_1.id)])
+        self.assertEqual(len(summaries), 2)
+        # The visits match no summary type, they get a summary without type
+        summary = summaries - delivery_summary
+        self.assertFalse(summary.event_type_id)
+        self.assertEqual(summary.event_total_count, 2)
+        self.assertFalse(delivery_summary.event_total_count)
+
+    def test_compute_invoice_amount_residual(self):
+        for partner in (self.partner_1, self.partner_1, self.commercial_partner_3):
+            self._create_invoice(partner).action_post()
+        events_1 = self.planned_events.filtered(
+            lambda e: e.target_partner_id == self.partner_1
+        )
+        self.assertEqual(len(events_1), 2)
+        journal = self.AccountJournal.create(
+            {"name": "Test planner bank", "type": "bank", "code": "TPLB"}
+        )
+        self.env["sale.payment.sheet"].create(
+            {
+                "journal_id": journal.id,
+                "line_ids": [
+                    (
+                        0,
+                        0,
+                        {
+                            "partner_id": self.partner_1.id,
+                            "amount": 30.0,
+                            "sale_planner_calendar_event_id": events_1[0].id,
+                        },
+                    )
+                ],
+            }
+        )
+        self.planned_events.invalidate_recordset(["invoice_amount_residual"])
+        amounts = {
+            event: event.invoice_amount_residual for event in self.planned_events
+        }
+        # The open payment sheet amount is only subtracted for its event
+        self.assertEqual(amounts[events_1[0]], 170.0)
+        self.assertEqual(amounts[events_1[1]], 200.0)
+        # Partner without invoices
+        event_2 = self.planned_events.filtered(
+            lambda e: e.target_partner_id == self.partner_2
+        )
+        self.assertEqual(amounts[event_2], 0.0)
+        # The invoices of the commercial partner are used for its contacts
+        event_3 = self.planned_events.filtered(
+            lambda e: e.target_partner_id == self.partner_3
+        )
+        self.assertEqual(amounts[event_3], 100.0)
+
+    def test_compute_contact(self):
+        self.partner_2.phone = "222"
+        self.Partner.create(
+            [
+                {"name": "Not a planner contact", "parent_id": self.partner_1.id},
+                {
+                    "name": "A planner contact",
+                    "parent_id": self.partner_1.id,
+                    "mobile": "111",
+                    "is_sale_planner_contact": True,
+                },
+                {
+                    "name": "B planner contact",
+                    "parent_id": self.partner_1.id,
+                    "mobile": "112",
+                    "is_sale_planner_contact": True,
+                },
+            ]
+        )
+        self.planned_events.invalidate_recordset(
+            ["partner_mobile", "partner_contact_name"]
+        )
+        for event in self.planned_events:
+            if event.target_partner_id == self.partner_1:
+                # First planner contact of the partner
+                self.assertEqual(event.partner_mobile, "111")
+                self.assertEqual(event.partner_contact_name, "A planner contact")
+            elif event.target_partner_id == self.partner_2:
+                # No contact, the phone of the partner is used
+                self.assertEqual(event.partner_mobile, "222")
+                self.assertFalse(event.partner_contact_name)
+            else:
+                self.assertFalse(event.partner_mobile)
+                self.assertFalse(event.partner_contact_name)
 
     def test_reassign_wizard(self):
         wiz_form = Form(self.env["sale.planner.calendar.reassign.wiz"])
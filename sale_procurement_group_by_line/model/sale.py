@@ -3,6 +3,8 @@
 # © 2016 Serpent Consulting Services Pvt. Ltd.
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from collections import defaultdict
+
 from odoo import fields, models
 from odoo.tools.float_utils import float_compare
 
@@ -36,6 +38,11 @@ class SaleOrderLine(models.Model):
         )
         procurements = []
         groups = {}
+        grouped_order_ids = set()
+        new_group_vals = {}
+        group_vals = {}
+        new_group_line_ids = defaultdict(list)
+        lines_to_procure = []
         if not previous_product_uom_qty:
             previous_product_uom_qty = {}
         for line in self:
@@ -48,36 +55,59 @@ class SaleOrderLine(models.Model):
                 == 0
             ):
                 continue
+            lines_to_procure.append((line, qty))
 
             group_id = line._get_procurement_group()
 
             # Group the sales order lines with same procurement group
-            # according to the group key
-            for order_line in line.order_id.order_line:
-                g_id = order_line.procurement_group_id or False
-                if g_id:
-                    groups[order_line._get_procurement_group_key()] = g_id
+            # according to the group key, the groups of each order being
+            # mapped once.
+            if line.order_id.id not in grouped_order_ids:
+                grouped_order_ids.add(line.order_id.id)
+                for order_line in line.order_id.order_line:
+                    g_id = order_line.procurement_group_id or False
+                    if g_id:
+                        groups[order_line._get_procurement_group_key()] = g_id
             if not group_id:
-                group_id = groups.get(line._get_procurement_group_key())
+                group_key = line._get_procurement_group_key()
+                group_id = groups.get(group_key)
 
             if not group_id:
-                vals = line._prepare_procurement_group_vals()
-                group_id = self.env["procurement.group"].create(vals)
-            else:
-                # In case the procurement group is already created and the
-                # order was cancelled, we need to update certain values
-                # of the group.
-                updated_vals = {}
-                if group_id.partner_id != line.order_id.partner_shipping_id:
-                    updated_vals.update(
-                        {"partner_id": line.order_id.partner_shipping_id.id}
-                    )
-                if group_id.move_type != line.order_id.picking_policy:
-                    updated_vals.update({"move_type": line.order_id.picking_policy})
-                if updated_vals:
-                    group_id.write(updated_vals)
+                # The new groups are created all at once below
+                if group_key not in new_group_vals:
+                    new_group_vals[group_key] = line._prepare_procurement_group_vals()
+                new_group_line_ids[group_key].append(line.id)
+                continue
+            # In case the procurement group is already created and the
+            # order was cancelled, we need to update certain values
+            # of the group, written below for all the groups at once.
+            group_vals[group_id] = {
+                "partner_id": line.order_id.partner_shipping_id.id,
+                "move_type": line.order_id.picking_policy,
+            }
             line.procurement_group_id = group_id
+        groups_by_vals = defaultdict(lambda: self.env["procurement.group"])
+        for group_id, vals in group_vals.items():
+            updated_vals = {}
+            if group_id.partner_id.id != vals["partner_id"]:
+                updated_vals["partner_id"] = vals["partner_id"]
+            if group_id.move_type != vals["move_type"]:
+                updated_vals["move_type"] = vals["move_type"]
+            if updated_vals:
+                groups_by_vals[tuple(sorted(updated_vals.items()))] |= group_id
+        for updated_vals, groups_to_update in groups_by_vals.items():
+            groups_to_update.write(dict(updated_vals))
+        if new_group_vals:
+            new_groups = self.env["procurement.group"].create(
+                list(new_group_vals.values())
+            )
+            for group_key, group_id in zip(new_group_vals, new_groups):
+                self.browse(
+                    new_group_line_ids[group_key]
+                ).procurement_group_id = group_id
 
+        for line, qty in lines_to_procure:
+            group_id = line.procurement_group_id
             values = line._prepare_procurement_values(group_id=group_id)
             product_qty = line.product_uom_qty - qty
 
@@ -106,14 +136,12 @@ class SaleOrderLine(models.Model):
             self.env["procurement.group"].run(procurements)
         # This next block is currently needed only because the scheduler trigger is done
         # by picking confirmation rather than stock.move confirmation
-        orders = self.mapped("order_id")
-        for order in orders:
-            pickings_to_confirm = order.picking_ids.filtered(
-                lambda p: p.state not in ["cancel", "done"]
-            )
-            if pickings_to_confirm:
-                # Trigger the Scheduler for Pickings
-                pickings_to_confirm.action_confirm()
+        pickings_to_confirm = self.order_id.picking_ids.filtered(
+            lambda p: p.state not in ["cancel", "done"]
+        )
+        if pickings_to_confirm:
+            # Trigger the Scheduler for the Pickings of all the orders at once
+            pickings_to_confirm.action_confirm()
         return super(
             SaleOrderLine, self.with_context(sale_group_by_line=True)
         )._action_launch_stock_rule(previous_product_uom_qty=previous_product_uom_qty)
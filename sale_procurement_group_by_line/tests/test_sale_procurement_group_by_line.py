@@ -3,6 +3,8 @@
 # © 2016 Serpent Consulting Services Pvt. Ltd.
 # License AGPL-3.0 or later (http://www.gnu.org/licenses/agpl).
 
+from unittest.mock import patch
+
 from odoo.tests import Form
 from odoo.tests.common import TransactionCase
 
@@ -141,3 +143,80 @@ class TestSaleProcurementGroupByLine(TransactionCase):
         self.sale.order_line[1].product_uom_qty += 1
         self.assertEqual(self.sale.order_line[1].procurement_group_id, proc_group)
         self.assertEqual(len(self.line1.move_ids), 1)
+
+    def _confirm_counting_group_keys(self, lines_count):
+        """Confirm a sale order with the given number of lines, returning the
+        number of group keys computed"""
+        sale = self.sale_model.create(
+            {
+                "partner_id": self.customer.id,
+                "warehouse_id": self.warehouse_id.id,
+                "order_line": [
+                    (
+                        0,
+                        0,
+                        {
+                            "product_id": self.new_product1.id,
+                            "product_uom_qty": 1.0,
+                        },
+                    )
+                    for _i in range(lines_count)
+                ],
+            }
+        )
+        sale_line_class = type(self.order_line_model)
+        with patch.object(
+            sale_line_class,
+            "_get_procurement_group_key",
+            autospec=True,
+            side_effect=sale_line_class._get_procurement_group_key,
+        ) as group_key_mock:
+            sale.action_confirm()
+        self.assertEqual(len(sale.order_line.procurement_group_id), 1)
+        return group_key_mock.call_count
+
+    def test_07_procurement_group_linear(self):
+        """The group keys computed grow linearly with the order lines"""
+        calls_count = self._confirm_counting_group_keys(10)
+        # Other modules may compute the key once more per created group
+        self.assertEqual(self._confirm_counting_group_keys(20) - calls_count, 10)
+
+    def test_08_confirm_several_orders(self):
+        # Another warehouse so that the orders are not grouped together
+        # whatever the group key
+        warehouse_2 = self.env["stock.warehouse"].create(
+            {"name": "Test Warehouse 2", "code": "TWH2"}
+        )
+        sale_2 = self.sale.copy(
+            {"picking_policy": "one", "warehouse_id": warehouse_2.id}
+        )
+        sale_2.order_line.warehouse_id = warehouse_2
+        sales = self.sale | sale_2
+        picking_class = type(self.env["stock.picking"])
+        with patch.object(
+            picking_class,
+            "action_confirm",
+            autospec=True,
+            side_effect=picking_class.action_confirm,
+        ) as confirm_mock:
+            sales.action_confirm()
+        self.assertTrue(self.sale.picking_ids)
+        self.assertTrue(sale_2.picking_ids)
+        # The pickings of all the orders are confirmed by a single call
+        self.assertEqual(
+            len(
+                [
+                    call
+                    for call in confirm_mock.call_args_list
+                    if call.args[0] == sales.picking_ids
+                ]
+            ),
+            1,
+        )
+        for sale in sales:
+            group = sale.order_line.procurement_group_id
+            self.assertEqual(len(group), 1)
+            self.assertEqual(group.move_type, sale.picking_policy)
+            self.assertTrue(
+                all(p.state not in ("draft", "cancel") for p in sale.picking_ids)
+            )